@@ -0,0 +1,200 @@
+import argparse
+import json
+import logging
+import os
+import socket
+import tempfile
+from pathlib import Path
+from typing import Any, Dict
+
+#: Where the baseline DynamoDB calls per request of each backend are stored.
+#: Call counts don't depend on the machine, so these are committed.
+BASELINES_PATH = Path(__file__).parent / "baselines"
+
+#: Backends that make no DynamoDB calls, so can only be compared by timings
+TIMINGS_ONLY_BACKENDS = {"memory", "sqlite"}
+
+#: Where the baseline results of each backend on this machine are stored, to
+#: compare timings with. Timings only compare on the same machine, so these
+#: aren't committed.
+LOCAL_BASELINES_PATH = BASELINES_PATH / "local"
+
+#: Settings for the API, unless they're already set
+ENVIRONMENT = {
+    "OSRS_TAGS_TABLE_NAME": "tags",
+    "OSRS_TAG_GROUPS_TABLE_NAME": "tag_groups",
+    # Env vars required by boto3. The in-memory stand-in only knows real regions.
+    "AWS_DEFAULT_REGION": "eu-west-2",
+    "AWS_ACCESS_KEY_ID": "fake-key",
+    "AWS_SECRET_ACCESS_KEY": "fake-secret-key",
+}
+
+#: Settings that DynamoDB call counts depend on, which override the environment.
+#: Tag group snapshots never expire, so however long a run takes on a machine,
+#: no scenario's count includes refreshing them.
+FIXED_ENVIRONMENT = {
+    "OSRS_TAG_GROUPS_CACHE_TTL": "1e9",
+}
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_moto_dynamodb() -> Any:
+    """
+    Start an in-memory DynamoDB stand-in in this process, pointing the API at it
+    """
+    from moto.server import ThreadedMotoServer
+
+    port = _free_port()
+    server = ThreadedMotoServer(ip_address="127.0.0.1", port=port)
+    server.start()
+    os.environ["LOCAL_DYNAMODB_ENDPOINT"] = f"http://127.0.0.1:{port}"
+    return server
+
+
+def save_baseline(path: Path, baseline: Dict[str, Any]):
+    """
+    Store results in a baseline, over those of any scenarios that weren't run
+    """
+    saved: Dict[str, Any] = {}
+    if path.is_file():
+        saved = json.loads(path.read_text())
+    saved.update(baseline)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(saved, indent=2) + "\n")
+    print(f"Saved baseline to {path}")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks",
+        description=(
+            "Measure the latency, throughput and DynamoDB calls of API requests, "
+            "and compare the calls, and optionally the latency, against stored "
+            "baselines"
+        ),
+    )
+    parser.add_argument(
+        "--backend",
+        choices=["memory", "sqlite", "moto", "local"],
+        default="moto",
+        help=(
+            "moto (default): an in-process DynamoDB stand-in. local: "
+            "dynamodb-local at LOCAL_DYNAMODB_ENDPOINT (default "
+            "http://localhost:8001), whose tables are replaced. memory: tags "
+            "kept in memory. sqlite: tags in a temporary SQLite database. "
+            "memory and sqlite make no DynamoDB calls, so always compare timings."
+        ),
+    )
+    parser.add_argument("--rounds", type=int, default=30, help="requests per scenario")
+    parser.add_argument("--only", help="only run scenarios with names containing this")
+    parser.add_argument(
+        "--save",
+        action="store_true",
+        help="store the results as this machine's baseline, to compare timings with",
+    )
+    parser.add_argument(
+        "--save-calls",
+        action="store_true",
+        help="store the DynamoDB calls per request as the committed baseline",
+    )
+    parser.add_argument(
+        "--timings",
+        action="store_true",
+        help="also compare p95 latencies with this machine's baseline",
+    )
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.25,
+        help="fraction that p95 latency can exceed the baseline by",
+    )
+    parser.add_argument(
+        "--min-slowdown-ms",
+        type=float,
+        default=2.0,
+        help="smallest p95 slowdown counted as a regression, to ignore noise",
+    )
+    args = parser.parse_args()
+    if args.backend in TIMINGS_ONLY_BACKENDS:
+        if args.save_calls:
+            parser.error(f"the {args.backend} backend makes no DynamoDB calls")
+        args.timings = True
+
+    for name, value in ENVIRONMENT.items():
+        os.environ.setdefault(name, value)
+    os.environ.update(FIXED_ENVIRONMENT)
+    server = None
+    if args.backend == "moto":
+        server = start_moto_dynamodb()
+    elif args.backend == "local":
+        os.environ.setdefault("LOCAL_DYNAMODB_ENDPOINT", "http://localhost:8001")
+
+    # The API reads its settings on import, so only import it once they're set
+    from benchmarks.suite import Result, compare_calls, compare_timings, run
+    from osrs_items_api.memory_tag_store import MemoryTagStore
+    from osrs_items_api.sqlite_tag_store import SQLiteTagStore
+
+    # Logging every request would be most of what's measured
+    logging.getLogger().setLevel(logging.WARNING)
+    logging.getLogger("werkzeug").setLevel(logging.WARNING)
+
+    try:
+        with tempfile.TemporaryDirectory() as directory:
+            if args.backend == "memory":
+                tag_store = MemoryTagStore()
+            elif args.backend == "sqlite":
+                tag_store = SQLiteTagStore(Path(directory) / "tags.sqlite3")
+            else:
+                tag_store = None
+            results = run(args.rounds, only=args.only, tag_store=tag_store)
+    finally:
+        if server is not None:
+            server.stop()
+
+    baseline_name = f"{args.backend}.json"
+    if args.save:
+        save_baseline(
+            LOCAL_BASELINES_PATH / baseline_name,
+            {name: result._asdict() for name, result in results.items()},
+        )
+    if args.save_calls:
+        save_baseline(
+            BASELINES_PATH / baseline_name,
+            {name: result.calls_per_request for name, result in results.items()},
+        )
+    if args.save or args.save_calls:
+        return
+
+    regressions = []
+    calls_path = BASELINES_PATH / baseline_name
+    if args.backend not in TIMINGS_ONLY_BACKENDS and calls_path.is_file():
+        regressions += compare_calls(results, json.loads(calls_path.read_text()))
+        print(f"Compared DynamoDB calls with {calls_path}")
+    elif args.backend not in TIMINGS_ONLY_BACKENDS:
+        print(f"No baseline at {calls_path} to compare with, run with --save-calls")
+
+    timings_path = LOCAL_BASELINES_PATH / baseline_name
+    if args.timings and timings_path.is_file():
+        baseline = {
+            name: Result(**result)
+            for name, result in json.loads(timings_path.read_text()).items()
+        }
+        regressions += compare_timings(
+            results, baseline, args.tolerance, args.min_slowdown_ms
+        )
+        print(f"Compared timings with {timings_path}")
+    elif args.timings:
+        print(f"No baseline at {timings_path} to compare with, run with --save")
+
+    if regressions:
+        raise SystemExit(f"{len(regressions)} regressions:\n" + "\n".join(regressions))
+    print("No regressions")
+
+
+if __name__ == "__main__":
+    main()
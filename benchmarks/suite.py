@@ -0,0 +1,340 @@
+import random
+import statistics
+import time
+from itertools import product
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+import boto3
+from fastapi.testclient import TestClient
+
+from osrs_items_api import items_service
+from osrs_items_api._tablespec import tag_groups_table, tags_table
+from osrs_items_api.api import create_app
+from osrs_items_api.constants import (
+    LOCAL_DYNAMODB_ENDPOINT,
+    TAG_GROUPS_TABLE_NAME,
+    TAGS_TABLE_NAME,
+)
+from osrs_items_api.dynamodb import dynamodb
+from osrs_items_api.tag_store import TagStore
+from osrs_items_api.tags_service import TagsService
+from osrs_items_api.types import Tag, TagGroup
+
+#: Number of distinct items in the benchmark bank, about as many as a full bank
+BANK_SIZE = 800
+
+#: Number of tag groups (bank tabs) the bank's items are tagged with
+GROUP_COUNT = 40
+
+#: Number of items tagged with each group
+TAGS_PER_GROUP = 50
+
+#: Number of tags written or deleted by each bulk tag write request
+BULK_WRITE_SIZE = 100
+
+#: Requests made before each scenario is measured
+WARMUP_ROUNDS = 2
+
+
+class Scenario(NamedTuple):
+    """
+    A request to make repeatedly and measure
+    """
+
+    #: Name of the scenario, which its results and baselines are stored under
+    name: str
+
+    #: HTTP method
+    method: str
+
+    #: Path and query of the request
+    url: str
+
+    #: JSON body, if any
+    body: Any = None
+
+
+class Result(NamedTuple):
+    """
+    Measurements of a scenario
+    """
+
+    #: Latency percentiles, in milliseconds
+    p50_ms: float
+    p95_ms: float
+    p99_ms: float
+
+    #: Requests handled per second, one at a time
+    throughput: float
+
+    #: DynamoDB API calls made per request
+    calls_per_request: float
+
+
+class Bank(NamedTuple):
+    """
+    The seeded data that scenarios refer to
+    """
+
+    #: IDs of all items in the bank
+    item_ids: List[int]
+
+    #: IDs of the items tagged with each group, by group name
+    groups: Dict[str, List[int]]
+
+
+def make_bank(seed: int = 0) -> Bank:
+    """
+    Pick a bank of main items and split them into overlapping tag groups,
+    the same way every time
+    """
+    rng = random.Random(seed)
+    item_ids = sorted(rng.sample(items_service.catalog.main_ids, BANK_SIZE))
+    groups = {
+        f"tab-{n}": sorted(rng.sample(item_ids, TAGS_PER_GROUP))
+        for n in range(GROUP_COUNT)
+    }
+    return Bank(item_ids=item_ids, groups=groups)
+
+
+def create_tables():
+    """
+    Create clean tags and tag groups tables, replacing any that exist
+    """
+    client = boto3.client("dynamodb", endpoint_url=LOCAL_DYNAMODB_ENDPOINT)
+    for spec in (tags_table, tag_groups_table):
+        name = spec["TableName"]
+        try:
+            client.delete_table(TableName=name)
+            client.get_waiter("table_not_exists").wait(TableName=name)
+        except client.exceptions.ResourceNotFoundException:
+            pass
+        client.create_table(**spec)
+        client.get_waiter("table_exists").wait(TableName=name)
+
+    print(f"Created tables {TAGS_TABLE_NAME} and {TAG_GROUPS_TABLE_NAME}")
+
+
+async def seed(bank: Bank, tag_store: Optional[TagStore]):
+    """
+    Write the bank's tag groups and tags to a tag store, by default DynamoDB
+    """
+    tags_service = tag_store or await TagsService.connect()
+    for n, (group_name, item_ids) in enumerate(bank.groups.items()):
+        await tags_service.add_tag_group(
+            TagGroup(
+                group_name=group_name,
+                description=f"Bank tab {n}",
+                item_icon_id=item_ids[0],
+            )
+        )
+        await tags_service.add_tags(
+            [Tag(item_id=item_id, group_name=group_name) for item_id in item_ids]
+        )
+
+
+def _query(params: Iterable[Tuple[str, Any]]) -> str:
+    return "&".join(f"{name}={value}" for name, value in params)
+
+
+def item_search_scenarios() -> List[Scenario]:
+    """
+    Pages of /items with each combination of filters
+    """
+    name_filters = [None, ("nameLike", "dragon"), ("nameStartsWith", "rune")]
+    tag_filters = [None, "tab-0", "tab-0,tab-1"]
+
+    scenarios = []
+    for name_filter, members, has_tags, related in product(
+        name_filters, [True, False], tag_filters, [False, True]
+    ):
+        params: List[Tuple[str, Any]] = [("limit", 100)]
+        labels = []
+        if name_filter is not None:
+            params.append(name_filter)
+            labels.append(name_filter[0])
+        if not members:
+            params.append(("includeMembers", "false"))
+            labels.append("free")
+        if has_tags is not None:
+            params.append(("hasTags", has_tags))
+            labels.append(f"hasTags={len(has_tags.split(','))}")
+        if related:
+            params.append(("includeRelated", "true"))
+            labels.append("related")
+
+        name = f"items[{','.join(labels) or 'page'}]"
+        scenarios.append(Scenario(name, "GET", f"/items?{_query(params)}"))
+
+    return scenarios
+
+
+def scenarios(bank: Bank) -> List[Scenario]:
+    """
+    All benchmark scenarios, over the given seeded bank
+    """
+    page_ids = ",".join(map(str, bank.item_ids[:50]))
+    tab_0 = bank.groups["tab-0"]
+    write_tags = [
+        {"itemId": item_id, "groupName": "bench-writes"}
+        for item_id in bank.item_ids[:BULK_WRITE_SIZE]
+    ]
+
+    return [
+        *item_search_scenarios(),
+        Scenario("items[all]", "GET", "/items"),
+        Scenario("items[itemId,related]", "GET", "/items?itemId=1891&includeRelated=1"),
+        Scenario(
+            "items[nameLike,relevance]",
+            "GET",
+            "/items?nameLike=dragon&orderBy=relevance&limit=20",
+        ),
+        Scenario(
+            "items[ids=bank]",
+            "GET",
+            f"/items?ids={','.join(map(str, bank.item_ids))}",
+        ),
+        Scenario("items/batch[bank]", "POST", "/items/batch", {"ids": bank.item_ids}),
+        Scenario("items/tag", "GET", "/items/tag/tab-0"),
+        Scenario(
+            "items/tags[bank]",
+            "POST",
+            "/items/tags?includeGroups=true",
+            {"groupNames": list(bank.groups)},
+        ),
+        Scenario("tags/item", "GET", f"/tags/item/{tab_0[0]}"),
+        Scenario("tags/items[page]", "GET", f"/tags/items?ids={page_ids}"),
+        Scenario("tagGroups", "GET", "/tagGroups"),
+        Scenario("groups[hasItems=1]", "GET", f"/groups?hasItems={tab_0[0]}"),
+        Scenario(
+            "groups[hasItems=3]",
+            "GET",
+            f"/groups?hasItems={','.join(map(str, tab_0[:3]))}",
+        ),
+        Scenario(f"tags[post {BULK_WRITE_SIZE}]", "POST", "/tags", write_tags),
+        Scenario(f"tags[delete {BULK_WRITE_SIZE}]", "DELETE", "/tags", write_tags),
+    ]
+
+
+class CallCounter:
+    """
+    Counts the DynamoDB API calls made by a botocore client
+    """
+
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self, **kwargs):
+        self.calls += 1
+
+
+def measure(
+    client: TestClient, scenario: Scenario, rounds: int, counter: CallCounter
+) -> Result:
+    """
+    Make a scenario's request repeatedly, one at a time, and measure it
+    """
+
+    def request():
+        response = client.request(scenario.method, scenario.url, json=scenario.body)
+        if response.status_code != 200:
+            raise RuntimeError(
+                f"{scenario.name} responded with {response.status_code}: "
+                f"{response.text[:200]}"
+            )
+
+    for _ in range(WARMUP_ROUNDS):
+        request()
+
+    counter.calls = 0
+    latencies = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        request()
+        latencies.append((time.perf_counter() - start) * 1000)
+
+    percentiles = statistics.quantiles(latencies, n=100, method="inclusive")
+    return Result(
+        p50_ms=round(percentiles[49], 3),
+        p95_ms=round(percentiles[94], 3),
+        p99_ms=round(percentiles[98], 3),
+        throughput=round(rounds / (sum(latencies) / 1000), 1),
+        calls_per_request=round(counter.calls / rounds, 2),
+    )
+
+
+def run(
+    rounds: int, only: Optional[str] = None, tag_store: Optional[TagStore] = None
+) -> Dict[str, Result]:
+    """
+    Seed an empty tag store, by default clean DynamoDB tables, and measure every
+    scenario, or only those with names containing a substring
+    """
+    if tag_store is None:
+        create_tables()
+    bank = make_bank()
+    counter = CallCounter()
+
+    results = {}
+    with TestClient(create_app(tag_store)) as client:
+        assert client.portal is not None
+        client.portal.call(seed, bank, tag_store)
+        if tag_store is None:
+            resource = client.portal.call(dynamodb)
+            resource.meta.client.meta.events.register("before-call.dynamodb", counter)
+
+        for scenario in scenarios(bank):
+            if only is not None and only not in scenario.name:
+                continue
+            results[scenario.name] = result = measure(client, scenario, rounds, counter)
+            print(format_result(scenario.name, result), flush=True)
+
+    return results
+
+
+def format_result(name: str, result: Result) -> str:
+    return (
+        f"{name:<46} p50 {result.p50_ms:>8.2f}ms  p95 {result.p95_ms:>8.2f}ms  "
+        f"p99 {result.p99_ms:>8.2f}ms  {result.throughput:>8.1f}/s  "
+        f"{result.calls_per_request:>6.2f} calls"
+    )
+
+
+def compare_calls(results: Dict[str, Result], baseline: Dict[str, float]) -> List[str]:
+    """
+    Compare the DynamoDB calls per request of results against a baseline of
+    them, returning a description of each scenario that makes more calls
+    """
+    regressions = []
+    for name, result in results.items():
+        if name in baseline and result.calls_per_request > baseline[name] + 0.01:
+            regressions.append(
+                f"{name}: {result.calls_per_request:.2f} DynamoDB calls per "
+                f"request, was {baseline[name]:.2f}"
+            )
+    return regressions
+
+
+def compare_timings(
+    results: Dict[str, Result],
+    baseline: Dict[str, Result],
+    tolerance: float,
+    min_slowdown_ms: float,
+) -> List[str]:
+    """
+    Compare the latencies of results against a baseline recorded on the same
+    machine, returning a description of each regression: a p95 latency more
+    than ``tolerance`` (a fraction) and ``min_slowdown_ms`` slower than the
+    baseline's
+    """
+    regressions = []
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+        base = baseline[name]
+        slowdown = result.p95_ms - base.p95_ms
+        if result.p95_ms > base.p95_ms * (1 + tolerance) and slowdown > min_slowdown_ms:
+            regressions.append(
+                f"{name}: p95 {result.p95_ms:.2f}ms, was {base.p95_ms:.2f}ms"
+            )
+    return regressions
@@ -0,0 +1,33 @@
+import sys
+from importlib.metadata import version
+from pathlib import Path
+
+from osrsbox import items_api
+
+from osrs_items_api.catalog import ItemRecord
+from osrs_items_api.icon_store import osrsbox_icons
+from osrs_items_api.snapshot import CatalogSnapshot
+
+
+def build_catalog_snapshot(path: Path):
+    """
+    Compile the item database into a catalog snapshot file, to be memory-mapped
+    by the API
+    """
+    osrsbox_items = items_api.load()
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(
+        CatalogSnapshot.build(
+            (ItemRecord.from_osrsbox(osb_item) for osb_item in osrsbox_items),
+            osrsbox_icons(osrsbox_items),
+            source_version=version("osrsbox"),
+        )
+    )
+    print(f"Wrote catalog snapshot to {path}")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 2:
+        raise SystemExit(f"Usage: {sys.argv[0]} <output path>")
+
+    build_catalog_snapshot(Path(sys.argv[1]))
@@ -1,27 +1,44 @@
-from typing import List, Optional
-
-from fastapi import FastAPI
+import asyncio
+from enum import Enum
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Set
+
+import orjson
+from fastapi import APIRouter, Depends, FastAPI, Header
+from fastapi.encoders import jsonable_encoder
+from fastapi.exceptions import RequestValidationError
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from fastapi_camelcase import CamelModel
 from mangum import Mangum
-from starlette.responses import JSONResponse
+from pydantic.error_wrappers import ErrorWrapper
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response
 
-from osrs_items_api import items_service
+from osrs_items_api import compression, icon_store, items_service
+from osrs_items_api.constants import SQLITE_PATH, TAG_STORE
+from osrs_items_api.dynamodb import close_dynamodb
 from osrs_items_api.logging import get_logger
+from osrs_items_api.memory_tag_store import MemoryTagStore
+from osrs_items_api.sqlite_tag_store import SQLiteTagStore
+from osrs_items_api.tag_store import TagStore
 from osrs_items_api.tags_service import TagsService
 from osrs_items_api.types import Item, Tag, TagGroup
 
 logger = get_logger()
 
-app = FastAPI()
+#: The API's routes, which ``create_app`` builds apps from
+router = APIRouter(default_response_class=ORJSONResponse)
 
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["*"],
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
+
+async def get_tag_store(request: Request) -> TagStore:
+    """
+    Get the app's tag store, by default a tags service over the process's shared
+    DynamoDB connection
+    """
+    tag_store = request.app.state.tag_store
+    if tag_store is None:
+        return await TagsService.shared()
+    return tag_store
 
 
 class ErrorMessage(CamelModel):
@@ -30,10 +47,15 @@ class ErrorMessage(CamelModel):
     message: str
 
 
-# TODO: invert into app builder that accepts services that fill some interface
-#       so e.g. we can unit test without needing docker
+class ItemOrder(str, Enum):
+    """Orderings of item search results"""
+
+    #: In order of item ID
+    ITEM_ID = "itemId"
 
-# TODO: Async API
+    #: Best name matches first (exact, then prefix, then substring matches), then
+    #: in order of item ID
+    RELEVANCE = "relevance"
 
 
 class ItemsSearchResult(CamelModel):
@@ -43,298 +65,953 @@ class ItemsSearchResult(CamelModel):
     #: The items returned on this page
     items: List[Item]
 
+    #: Requested IDs that no item exists with, when looking items up by ID
+    missing_ids: Optional[List[int]] = None
+
+
+class ItemIds(CamelModel):
+    #: IDs of items to look up
+    ids: List[int]
+
+
+class GroupNames(CamelModel):
+    #: Names of tag groups
+    group_names: List[str]
+
+
+class GroupsItems(CamelModel):
+    #: Items that belong to each tag group, by group name
+    items: Dict[str, List[Item]]
+
+    #: Info about each tag group that has any, by group name, if requested
+    groups: Optional[Dict[str, TagGroup]] = None
+
+
+#: Item attribute names, by the camelCase name they're serialised with
+ITEM_FIELDS: Dict[str, str] = {
+    field.alias: name for name, field in Item.__fields__.items()
+}
+
+
+def _invalid_query(name: str, msg: str) -> RequestValidationError:
+    return RequestValidationError([ErrorWrapper(ValueError(msg), loc=("query", name))])
+
+
+def _parse_item_ids(ids: str, name: str = "ids") -> List[int]:
+    try:
+        return [int(item_id) for item_id in ids.split(",") if item_id.strip()]
+    except ValueError:
+        raise _invalid_query(name, "Expected a comma-separated list of item IDs")
+
+
+def item_ids(ids: Optional[str] = None) -> Optional[List[int]]:
+    """
+    Parse a comma-separated list of item IDs to look up, if given
+    """
+    return None if ids is None else _parse_item_ids(ids)
+
+
+def required_item_ids(ids: str) -> List[int]:
+    """
+    Parse a comma-separated list of at least one item ID
+    """
+    parsed = _parse_item_ids(ids)
+    if not parsed:
+        raise _invalid_query("ids", "Expected at least one item ID")
+    return parsed
+
 
-def _get_items_by_tag(tags_service: TagsService, tag_name: str) -> List[Item]:
-    tags = tags_service.get_tags_by_group_name(tag_name)
-    return list(
-        items_service.filter_main_items(
-            (items_service.get_item(tag.item_id) for tag in tags)
+def item_fields(fields: Optional[str] = None) -> Optional[Dict[str, str]]:
+    """
+    Parse a comma-separated list of camelCase item fields to return, if given,
+    into a mapping of those fields to item attribute names
+    """
+    if fields is None:
+        return None
+
+    requested = [field.strip() for field in fields.split(",") if field.strip()]
+    unknown = [field for field in requested if field not in ITEM_FIELDS]
+    if unknown:
+        msg = f"Unknown item fields {unknown}, expected some of {list(ITEM_FIELDS)}"
+        raise _invalid_query("fields", msg)
+
+    return {field: ITEM_FIELDS[field] for field in requested}
+
+
+def _project_items(
+    item_ids: Iterable[int], fields: Dict[str, str]
+) -> List[Dict[str, Any]]:
+    """
+    Serialise only the given fields of items, by ID
+    """
+    catalog = items_service.catalog
+    return [catalog.project(item_id, fields) for item_id in item_ids]
+
+
+def _json_response(content: bytes) -> Response:
+    """
+    Respond with already serialised JSON
+    """
+    return Response(content=content, media_type="application/json")
+
+
+def _lookup_response(
+    item_ids: Iterable[int], fields: Optional[Dict[str, str]]
+) -> Response:
+    """
+    Respond with the items that exist out of several looked up by ID, in the
+    order given, and the IDs of those that don't
+    """
+    found_ids, missing_ids = items_service.lookup_item_ids(item_ids)
+    catalog = items_service.catalog
+    if fields is not None:
+        return ORJSONResponse(
+            content={
+                "totalCount": len(found_ids),
+                "items": _project_items(found_ids, fields),
+                "missingIds": missing_ids,
+            }
         )
+
+    return _json_response(
+        b'{"totalCount":%d,"items":%s,"missingIds":%s}'
+        % (len(found_ids), catalog.items_json(found_ids), orjson.dumps(missing_ids))
     )
 
 
-@app.get("/items", response_model=ItemsSearchResult)
-def search_items(
+def _items_response(item_ids: Iterable[int]) -> Response:
+    """
+    Respond with a list of items by ID, joined from their pre-serialised JSON
+    """
+    return _json_response(items_service.catalog.items_json(item_ids))
+
+
+#: Cache-Control header for icons, which only change with the item database
+ICON_CACHE_CONTROL = "public, max-age=2592000"
+
+#: Most icons in one sprite sheet, about a page of search results
+MAX_SPRITE_ICONS = 200
+
+#: Cache-Control header for item data, which only changes with the item database
+ITEM_CACHE_CONTROL = "public, max-age=86400"
+
+#: Cache-Control header for responses that depend on tags, which can change at
+#: any time
+TAGS_CACHE_CONTROL = "public, max-age=5"
+
+
+def _etag_matches(etag: str, if_none_match: Optional[str]) -> bool:
+    """
+    Whether an If-None-Match header matches an ETag, using weak comparison
+    """
+    if if_none_match is None:
+        return False
+    candidates = {
+        candidate.strip().removeprefix("W/") for candidate in if_none_match.split(",")
+    }
+    return "*" in candidates or etag.removeprefix("W/") in candidates
+
+
+def _not_modified(
+    etag: str, cache_control: str, if_none_match: Optional[str]
+) -> Optional[Response]:
+    """
+    A 304 response if the client already has the response with an ETag, or else
+    None
+    """
+    if not _etag_matches(etag, if_none_match):
+        return None
+    return Response(
+        status_code=304, headers={"ETag": etag, "Cache-Control": cache_control}
+    )
+
+
+def _with_validators(response: Response, etag: str, cache_control: str) -> Response:
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = cache_control
+    return response
+
+
+#: Item data bodies at least this big are kept once compressed, as they're
+#: the common unfiltered queries (all items, members or free-to-play items)
+PRECOMPRESS_MIN_SIZE = 256 * 1024
+
+#: Compressed bodies of large item data responses, by ETag
+precompressed = compression.CompressedBodies(max_entries=6)
+
+
+def _encoded(
+    response: Response, encoding: Optional[str], keep_as: Optional[str] = None
+) -> Response:
+    """
+    Compress a response's body with a negotiated encoding, if it's big enough to
+    be worth it. Large bodies are kept compressed under the given key, if any.
+    """
+    response.headers["Vary"] = "Accept-Encoding"
+    if encoding is None or len(response.body) < compression.MIN_COMPRESS_SIZE:
+        return response
+
+    body = compression.compress(response.body, encoding)
+    if keep_as is not None and len(response.body) >= PRECOMPRESS_MIN_SIZE:
+        precompressed.put(keep_as, encoding, body)
+
+    response.body = body
+    response.headers["Content-Encoding"] = encoding
+    response.headers["Content-Length"] = str(len(body))
+    return response
+
+
+def _item_data_etag(request: Request, encoding: Optional[str]) -> str:
+    """
+    Strong ETag of a response that only depends on the item database and the
+    request URL, in a given encoding
+    """
+    etag = icon_store.etag(
+        items_service.catalog_version.encode(),
+        request.url.path.encode(),
+        request.url.query.encode(),
+    )
+    return etag if encoding is None else f'{etag[:-1]}-{encoding}"'
+
+
+def _item_data_shortcut(
+    etag: str, encoding: Optional[str], if_none_match: Optional[str]
+) -> Optional[Response]:
+    """
+    A response to a request for item data that needn't be built, because the
+    client already has it or it's been compressed before, or else None
+    """
+    response = _not_modified(etag, ITEM_CACHE_CONTROL, if_none_match)
+    if response is None and encoding is not None:
+        body = precompressed.get(etag, encoding)
+        if body is not None:
+            response = _with_validators(
+                Response(
+                    content=body,
+                    media_type="application/json",
+                    headers={"Content-Encoding": encoding},
+                ),
+                etag,
+                ITEM_CACHE_CONTROL,
+            )
+
+    if response is not None:
+        response.headers["Vary"] = "Accept-Encoding"
+    return response
+
+
+def _item_data_response(
+    response: Response, etag: str, encoding: Optional[str]
+) -> Response:
+    """
+    Compress a response of item data and add its validators
+    """
+    return _with_validators(
+        _encoded(response, encoding, keep_as=etag), etag, ITEM_CACHE_CONTROL
+    )
+
+
+def _tags_response(
+    response: Response, accept_encoding: Optional[str], if_none_match: Optional[str]
+) -> Response:
+    """
+    Add a weak, short-lived validator to a response that depends on tags and
+    compress it, or respond with 304 instead if the client already has it
+    """
+    etag = "W/" + icon_store.etag(response.body)
+    return _not_modified(etag, TAGS_CACHE_CONTROL, if_none_match) or (
+        _with_validators(
+            _encoded(response, compression.accepted_encoding(accept_encoding)),
+            etag,
+            TAGS_CACHE_CONTROL,
+        )
+    )
+
+
+def _png_response(
+    etag: str, if_none_match: Optional[str], build_png: Callable[[], bytes]
+) -> Response:
+    """
+    Respond with a cacheable PNG image, only building it if the client doesn't
+    already have it
+    """
+    return _not_modified(etag, ICON_CACHE_CONTROL, if_none_match) or (
+        _with_validators(
+            Response(content=build_png(), media_type="image/png"),
+            etag,
+            ICON_CACHE_CONTROL,
+        )
+    )
+
+
+async def _get_item_ids_by_tag(tags_service: TagStore, tag_name: str) -> List[int]:
+    tags = await tags_service.get_tags_by_group_name(tag_name)
+    catalog = items_service.catalog
+    return [tag.item_id for tag in tags if catalog.is_main_item(tag.item_id)]
+
+
+async def _get_item_ids_with_tags(
+    tags_service: TagStore, group_names: Iterable[str]
+) -> Set[int]:
+    """
+    Get the IDs of items tagged with all of the given groups, with one concurrent
+    query per group
+    """
+    groups_tags = await asyncio.gather(
+        *map(tags_service.get_tags_by_group_name, group_names)
+    )
+    tagged_ids: Optional[Set[int]] = None
+    for tags in sorted(groups_tags, key=len):
+        group_ids = {tag.item_id for tag in tags}
+        tagged_ids = group_ids if tagged_ids is None else tagged_ids & group_ids
+        if not tagged_ids:
+            break
+    return tagged_ids or set()
+
+
+async def _get_group_names_with_items(
+    tags_service: TagStore, item_ids: Iterable[int]
+) -> Set[str]:
+    """
+    Get the names of groups that have all of the given items, with one concurrent
+    query per item
+    """
+    items_tags = await asyncio.gather(*map(tags_service.get_tags_by_item_id, item_ids))
+    group_names: Optional[Set[str]] = None
+    for tags in sorted(items_tags, key=len):
+        item_groups = {tag.group_name for tag in tags}
+        group_names = item_groups if group_names is None else group_names & item_groups
+        if not group_names:
+            break
+    return group_names or set()
+
+
+def _filter_by_name(
+    item_ids: Sequence[int], keyword: str, prefix: bool = False
+) -> Sequence[int]:
+    name_matches = items_service.search_item_ids(keyword, prefix=prefix)
+    if item_ids is items_service.catalog.main_ids:
+        return name_matches
+
+    matched_ids = set(name_matches)
+    return [item_id for item_id in item_ids if item_id in matched_ids]
+
+
+@router.get("/items", response_model=ItemsSearchResult)
+async def search_items(
+    request: Request,
     itemId: Optional[int] = None,
     nameLike: Optional[str] = None,
+    nameStartsWith: Optional[str] = None,
     includeMembers: bool = True,
     limit: Optional[int] = None,
     offset: Optional[int] = None,
+    after: Optional[int] = None,
     includeRelated: bool = False,
     hasTags: Optional[str] = None,
+    orderBy: ItemOrder = ItemOrder.ITEM_ID,
+    ids: Optional[List[int]] = Depends(item_ids),
+    fields: Optional[Dict[str, str]] = Depends(item_fields),
+    if_none_match: Optional[str] = Header(None),
+    accept_encoding: Optional[str] = Header(None),
 ):
     """
-    Search for items given some search criteria
+    Search for items given some search criteria.
+
+    Pages of results can be fetched either with ``offset`` and ``limit``, or
+    with ``after`` set to the ID of the last item of the previous page (in the
+    same order) and ``limit``, which stays cheap however deep the page is.
+
+    Alternatively, several items of any kind can be looked up at once with
+    ``ids``, a comma-separated list of item IDs. The items that exist are
+    returned in the order given, along with the IDs of those that don't, and
+    other search criteria are ignored.
     """
     logger.info("GET /items")
 
-    items = sorted(items_service.main_items(), key=lambda i: i.item_id)
+    # Without tags, results only depend on the item database and the query
+    encoding = compression.accepted_encoding(accept_encoding)
+    etag = None if hasTags and ids is None else _item_data_etag(request, encoding)
+    if etag is not None:
+        shortcut = _item_data_shortcut(etag, encoding, if_none_match)
+        if shortcut is not None:
+            return shortcut
 
-    if nameLike:
-        logger.info("Filtering by name %s", nameLike)
-        items = sorted(items_service.search_items(nameLike), key=lambda i: i.item_id)
+        if ids is not None:
+            logger.info("Looking up %d IDs", len(ids))
+            lookup = _lookup_response(ids, fields)
+            return _item_data_response(lookup, etag, encoding)
+
+    catalog = items_service.catalog
+    item_ids: Sequence[int] = catalog.main_ids
 
     if itemId:
         logger.info("Filtering by ID %s", itemId)
-        items = [item for item in items if item.item_id == itemId]
+        item_ids = [itemId] if catalog.is_main_item(itemId) else []
+
+    if nameLike:
+        logger.info("Filtering by name %s", nameLike)
+        item_ids = _filter_by_name(item_ids, nameLike)
+
+    if nameStartsWith:
+        logger.info("Filtering by name prefix %s", nameStartsWith)
+        item_ids = _filter_by_name(item_ids, nameStartsWith, prefix=True)
 
     if not includeMembers:
         logger.info("Filtering by non-members items")
-        items = [item for item in items if not item.members]
+        if item_ids is catalog.main_ids:
+            item_ids = catalog.free_ids
+        else:
+            item_ids = [
+                item_id for item_id in item_ids if not catalog.is_members_item(item_id)
+            ]
 
     if hasTags:
-        tags_set = set(hasTags.split(","))
         logger.info("Filtering by tags")
-        tags_service = TagsService()
-        tagged_items = set()
-        for tag_name in tags_set:
-            tagged_items |= set(_get_items_by_tag(tags_service, tag_name))
-        item_tags = {
-            item.item_id: {
-                tag.group_name for tag in tags_service.get_tags_by_item(item)
-            }
-            for item in tagged_items
-        }
-        ok_items = [
-            item for item in tagged_items if tags_set <= item_tags[item.item_id]
-        ]
-
-        items = [item for item in items if item in ok_items]
-
-    # -- Add related
-
-    if includeRelated:
-        logger.info("Adding related items")
-        extra_items = []
-        for item in items:
-            extra_items.extend(list(items_service.related_items(item)))
-
-        items = sorted(items + extra_items, key=lambda i: i.item_id)
+        # Only connect when tags are needed, to keep other searches off DynamoDB
+        tagged_ids = await _get_item_ids_with_tags(
+            await get_tag_store(request), set(hasTags.split(","))
+        )
+        if item_ids is catalog.main_ids:
+            item_ids = sorted(filter(catalog.is_main_item, tagged_ids))
+        else:
+            item_ids = [item_id for item_id in item_ids if item_id in tagged_ids]
+
+    # -- Ordering, related items and pagination
+
+    ranking_keyword = nameLike or nameStartsWith
+    if ranking_keyword and orderBy == ItemOrder.RELEVANCE:
+        logger.info("Ordering by relevance to %s", ranking_keyword)
+        if after is not None and after not in catalog:
+            raise _invalid_query("after", f"No item exists with ID {after}")
+        page_ids, total_count = items_service.page_by_relevance(
+            item_ids,
+            ranking_keyword,
+            include_related=includeRelated,
+            after=after,
+            offset=offset or 0,
+            limit=limit,
+        )
+    else:
+        page_ids, total_count = items_service.page_by_id(
+            item_ids,
+            include_related=includeRelated,
+            after=after,
+            offset=offset or 0,
+            limit=limit,
+        )
 
-    # -- Pagination
-    total_count = len(items)
+    response: Response
+    if fields is not None:
+        response = ORJSONResponse(
+            content={
+                "totalCount": total_count,
+                "items": _project_items(page_ids, fields),
+            }
+        )
+    else:
+        response = _json_response(
+            b'{"totalCount":%d,"items":%s}'
+            % (total_count, catalog.items_json(page_ids))
+        )
 
-    if offset is not None:
-        logger.info("Adding offset of %s", offset)
-        items = items[offset:]
+    if etag is None:
+        return _tags_response(response, accept_encoding, if_none_match)
+    return _item_data_response(response, etag, encoding)
 
-    items = items[:limit] if limit is not None else items
 
-    return ItemsSearchResult(
-        total_count=total_count,
-        items=items,
+@router.post("/items/batch", response_model=ItemsSearchResult)
+async def lookup_items(
+    body: ItemIds,
+    fields: Optional[Dict[str, str]] = Depends(item_fields),
+    accept_encoding: Optional[str] = Header(None),
+):
+    """
+    Look up several items of any kind by ID at once. The items that exist are
+    returned in the order given, along with the IDs of those that don't.
+    """
+    logger.info("POST /items/batch")
+    return _encoded(
+        _lookup_response(body.ids, fields),
+        compression.accepted_encoding(accept_encoding),
     )
 
 
-@app.get(
+@router.get(
     "/item/{itemId}",
     response_model=Item,
     responses={404: {"model": ErrorMessage, "description": "The item does not exist"}},
 )
-def get_item(itemId: int):
+async def get_item(
+    request: Request,
+    itemId: int,
+    fields: Optional[Dict[str, str]] = Depends(item_fields),
+    if_none_match: Optional[str] = Header(None),
+    accept_encoding: Optional[str] = Header(None),
+):
     """
     Get an item by ID
     """
     logger.info("GET /item/%s", itemId)
-    try:
-        return items_service.get_item(itemId)
-    except KeyError:
+    if itemId not in items_service.catalog:
         return JSONResponse(
             status_code=404, content={"message": f"No item exists with ID {itemId}"}
         )
 
-
-@app.get("/items/related/{itemId}", response_model=List[Item])
-def get_related_items(itemId: int):
+    encoding = compression.accepted_encoding(accept_encoding)
+    etag = _item_data_etag(request, encoding)
+    shortcut = _item_data_shortcut(etag, encoding, if_none_match)
+    if shortcut is not None:
+        return shortcut
+
+    response: Response
+    if fields is not None:
+        response = ORJSONResponse(content=_project_items([itemId], fields)[0])
+    else:
+        response = _json_response(items_service.catalog.item_json(itemId))
+    return _item_data_response(response, etag, encoding)
+
+
+@router.get("/items/related/{itemId}", response_model=List[Item])
+async def get_related_items(
+    request: Request,
+    itemId: int,
+    fields: Optional[Dict[str, str]] = Depends(item_fields),
+    if_none_match: Optional[str] = Header(None),
+    accept_encoding: Optional[str] = Header(None),
+):
     """
     Get all items related to the given main item
     """
     logger.info("GET /items/related/%s", itemId)
-    item = items_service.get_item(itemId)
-    return list(items_service.related_items(item))
+    encoding = compression.accepted_encoding(accept_encoding)
+    etag = _item_data_etag(request, encoding)
+    shortcut = _item_data_shortcut(etag, encoding, if_none_match)
+    if shortcut is not None:
+        return shortcut
+
+    item_ids = items_service.related_item_ids_many([itemId])
+
+    response: Response
+    if fields is not None:
+        response = ORJSONResponse(content=_project_items(item_ids, fields))
+    else:
+        response = _items_response(item_ids)
+    return _item_data_response(response, etag, encoding)
+
+
+@router.get(
+    "/icon/{itemId}",
+    response_class=Response,
+    responses={
+        200: {"content": {"image/png": {}}, "description": "The item's icon"},
+        404: {"model": ErrorMessage, "description": "The item does not exist"},
+    },
+)
+async def get_icon(itemId: int, if_none_match: Optional[str] = Header(None)):
+    """
+    Get an item's icon as a PNG image
+    """
+    logger.info("GET /icon/%s", itemId)
+    found = items_service.get_icon(itemId)
+    if found is None:
+        return JSONResponse(
+            status_code=404, content={"message": f"No item exists with ID {itemId}"}
+        )
+
+    png: bytes = found
+    return _png_response(icon_store.etag(png), if_none_match, lambda: png)
+
+
+@router.get(
+    "/icons/sprite",
+    response_class=Response,
+    responses={200: {"content": {"image/png": {}}, "description": "The sprite sheet"}},
+)
+async def get_icons_sprite(
+    item_ids: List[int] = Depends(required_item_ids),
+    if_none_match: Optional[str] = Header(None),
+):
+    """
+    Get a PNG sprite sheet of the icons of several items, stacked vertically in
+    the order given, with one equally-sized cell per item ID. At most
+    ``MAX_SPRITE_ICONS`` items can be in one sheet.
+    """
+    logger.info("GET /icons/sprite?ids=%s", item_ids)
+    if len(item_ids) > MAX_SPRITE_ICONS:
+        msg = f"Expected at most {MAX_SPRITE_ICONS} item IDs in a sprite sheet"
+        raise _invalid_query("ids", msg)
+    icons = [items_service.get_icon(item_id) or b"" for item_id in item_ids]
+    return _png_response(
+        icon_store.etag(orjson.dumps(item_ids), *icons),
+        if_none_match,
+        lambda: items_service.icon_store().sprite_sheet(item_ids),
+    )
 
 
-@app.get("/tags/item/{itemId}", response_model=List[Tag])
-def get_item_tags(itemId: int):
+@router.get("/tags/item/{itemId}", response_model=List[Tag])
+async def get_item_tags(
+    itemId: int,
+    tags_service: TagStore = Depends(get_tag_store),
+    if_none_match: Optional[str] = Header(None),
+    accept_encoding: Optional[str] = Header(None),
+):
     """
     Get the tags related to an item
     """
     logger.info("GET /tags/item/%s", itemId)
-    tags_service = TagsService()
-    item = items_service.get_item(item_id=itemId)
-    return tags_service.get_tags_by_item(item)
+    tags = await tags_service.get_tags_by_item_id(itemId)
+    return _tags_response(
+        ORJSONResponse(jsonable_encoder(tags)), accept_encoding, if_none_match
+    )
+
+
+def _items_tags_response(items_tags: Dict[int, List[Tag]]) -> Response:
+    """
+    Respond with the tags of several items, keyed by item ID as JSON requires
+    """
+    return ORJSONResponse(
+        jsonable_encoder({str(item_id): tags for item_id, tags in items_tags.items()})
+    )
+
+
+@router.get("/tags/items", response_model=Dict[int, List[Tag]])
+async def get_tags_by_items(
+    ids: Optional[List[int]] = Depends(item_ids),
+    tags_service: TagStore = Depends(get_tag_store),
+    if_none_match: Optional[str] = Header(None),
+    accept_encoding: Optional[str] = Header(None),
+):
+    """
+    Get the tags of several items at once, by item ID, given a comma-separated
+    list of item IDs
+    """
+    logger.info("GET /tags/items?ids=%s", ids)
+    if ids is None:
+        raise _invalid_query("ids", "field required")
+
+    items_tags = await tags_service.get_tags_by_item_ids(ids)
+    return _tags_response(
+        _items_tags_response(items_tags), accept_encoding, if_none_match
+    )
+
+
+@router.post("/tags/items", response_model=Dict[int, List[Tag]])
+async def post_tags_by_items(
+    body: ItemIds,
+    tags_service: TagStore = Depends(get_tag_store),
+    accept_encoding: Optional[str] = Header(None),
+):
+    """
+    Get the tags of several items at once, by item ID, for lists of IDs too long
+    to go in a URL
+    """
+    logger.info("POST /tags/items")
+    items_tags = await tags_service.get_tags_by_item_ids(body.ids)
+    return _encoded(
+        _items_tags_response(items_tags), compression.accepted_encoding(accept_encoding)
+    )
 
 
-@app.get("/items/tag/{groupName}", response_model=List[Item])
-def get_items_by_tag(groupName: str, includeRelated: Optional[bool] = False):
+@router.get("/items/tag/{groupName}", response_model=List[Item])
+async def get_items_by_tag(
+    groupName: str,
+    includeRelated: Optional[bool] = False,
+    fields: Optional[Dict[str, str]] = Depends(item_fields),
+    tags_service: TagStore = Depends(get_tag_store),
+    if_none_match: Optional[str] = Header(None),
+    accept_encoding: Optional[str] = Header(None),
+):
     """
     Get items that belong to a tag group
     """
     logger.info("GET /items/tag/%s", groupName)
-    tags_service = TagsService()
-    items = _get_items_by_tag(tags_service, groupName)
+    item_ids = await _get_item_ids_by_tag(tags_service, groupName)
 
     if includeRelated:
-        new_items: List[Item] = []
-        for item in items:
-            new_items.extend(items_service.related_items(item))
-        items += new_items
+        item_ids += items_service.related_item_ids_many(item_ids)
+
+    response: Response
+    if fields is not None:
+        response = ORJSONResponse(content=_project_items(item_ids, fields))
+    else:
+        response = _items_response(item_ids)
+    return _tags_response(response, accept_encoding, if_none_match)
+
+
+@router.post("/items/tags", response_model=GroupsItems)
+async def get_items_by_tags(
+    body: GroupNames,
+    includeRelated: Optional[bool] = False,
+    includeGroups: Optional[bool] = False,
+    fields: Optional[Dict[str, str]] = Depends(item_fields),
+    tags_service: TagStore = Depends(get_tag_store),
+    accept_encoding: Optional[str] = Header(None),
+):
+    """
+    Get the items that belong to each of several tag groups, such as the tabs
+    of a bank, and optionally the info about each group.
 
-    return items
+    Groups are queried concurrently, and items that belong to more than one
+    group are only resolved once.
+    """
+    logger.info("POST /items/tags groups=%s", body.group_names)
+    group_names = list(dict.fromkeys(body.group_names))
+    catalog = items_service.catalog
+
+    queries = asyncio.gather(*map(tags_service.get_tags_by_group_name, group_names))
+    if includeGroups:
+        groups_tags, all_groups = await asyncio.gather(
+            queries, tags_service.all_tag_groups()
+        )
+    else:
+        groups_tags, all_groups = await queries, []
+
+    groups_ids: Dict[str, List[int]] = {}
+    for group_name, tags in zip(group_names, groups_tags):
+        main_ids = [tag.item_id for tag in tags if catalog.is_main_item(tag.item_id)]
+        if includeRelated:
+            main_ids += [
+                related_id
+                for item_id in main_ids
+                for related_id in catalog.get_related_ids(item_id)
+            ]
+        groups_ids[group_name] = main_ids
+
+    groups = {group.group_name: group for group in all_groups}
+    groups_content = (
+        jsonable_encoder({name: groups[name] for name in group_names if name in groups})
+        if includeGroups
+        else None
+    )
 
+    # Each item is only resolved once, however many groups it's in
+    unique_ids = dict.fromkeys(
+        item_id for item_ids in groups_ids.values() for item_id in item_ids
+    )
 
-def _add_tag(
-    tags_service: TagsService, tag: Tag, include_related: Optional[bool] = False
-):
-    tags = [tag]
-    if include_related:
-        item = items_service.get_item(tag.item_id)
-        tags.extend(
-            Tag(item_id=item.item_id, group_name=tag.group_name)
-            for item in items_service.related_items(item)
+    response: Response
+    if fields is not None:
+        items = dict(zip(unique_ids, _project_items(unique_ids, fields)))
+        response = ORJSONResponse(
+            content={
+                "items": {
+                    name: [items[item_id] for item_id in item_ids]
+                    for name, item_ids in groups_ids.items()
+                },
+                "groups": groups_content,
+            }
+        )
+    else:
+        items_json = {item_id: catalog.item_json(item_id) for item_id in unique_ids}
+        groups_items_json = (
+            orjson.dumps(name)
+            + b":["
+            + b",".join(items_json[item_id] for item_id in item_ids)
+            + b"]"
+            for name, item_ids in groups_ids.items()
         )
-        logger.info("Including %s", tags)
+        response = _json_response(
+            b'{"items":{%s},"groups":%s}'
+            % (b",".join(groups_items_json), orjson.dumps(groups_content))
+        )
+
+    return _encoded(response, compression.accepted_encoding(accept_encoding))
 
-    return [tags_service.add_tag(t) for t in tags]
 
+def _with_related_tags(
+    tags: List[Tag], include_related: Optional[bool] = False
+) -> List[Tag]:
+    if not include_related:
+        return tags
 
-@app.post("/tag", response_model=List[Tag])
-def post_tag(tag: Tag, includeRelated: Optional[bool] = False):
+    with_related = list(tags)
+    for tag in tags:
+        with_related.extend(
+            Tag(item_id=related_id, group_name=tag.group_name)
+            for related_id in items_service.catalog.get_related_ids(tag.item_id)
+        )
+    logger.info("Including %s", with_related)
+    return with_related
+
+
+@router.post("/tag", response_model=List[Tag])
+async def post_tag(
+    tag: Tag,
+    includeRelated: Optional[bool] = False,
+    tags_service: TagStore = Depends(get_tag_store),
+):
     """
     Post a single tag
     """
     logger.info("POST /tag/ tag=%s", tag)
-    return _add_tag(tags_service=TagsService(), tag=tag, include_related=includeRelated)
+    return await tags_service.add_tags(_with_related_tags([tag], includeRelated))
 
 
-@app.post("/tags", response_model=List[Tag])
-def post_tags(tags: List[Tag], includeRelated: Optional[bool] = False):
+@router.post("/tags", response_model=List[Tag])
+async def post_tags(
+    tags: List[Tag],
+    includeRelated: Optional[bool] = False,
+    tags_service: TagStore = Depends(get_tag_store),
+):
     """
     Post several tags
     """
     logger.info("POST /tags/ tags=%s", tags)
-    tags_service = TagsService()
-
-    result = []
-    for tag in tags:
-        result.extend(
-            _add_tag(tags_service=tags_service, tag=tag, include_related=includeRelated)
-        )
+    return await tags_service.add_tags(_with_related_tags(tags, includeRelated))
 
 
-def _delete_tag(
-    tags_service: TagsService, tag: Tag, include_related: Optional[bool] = False
+@router.delete("/tag", response_model=List[Tag])
+async def delete_tag(
+    tag: Tag,
+    includeRelated: Optional[bool] = False,
+    tags_service: TagStore = Depends(get_tag_store),
 ):
-    tags = [tag]
-    if include_related:
-        item = items_service.get_item(tag.item_id)
-        tags.extend(
-            Tag(item_id=item.item_id, group_name=tag.group_name)
-            for item in items_service.related_items(item)
-        )
-        logger.info("Including %s", tags)
-
-    return [tags_service.delete_tag(t) for t in tags]
-
-
-@app.delete("/tag", response_model=List[Tag])
-def delete_tag(tag: Tag, includeRelated: Optional[bool] = False):
     """
     Delete a single tag
     """
     logger.info("DELETE /tag/ tag=%s", tag)
-    return _delete_tag(
-        tags_service=TagsService(), tag=tag, include_related=includeRelated
-    )
+    return await tags_service.delete_tags(_with_related_tags([tag], includeRelated))
 
 
-@app.delete("/tags", response_model=List[Tag])
-def delete_tags(tags: List[Tag], includeRelated: Optional[bool] = False):
+@router.delete("/tags", response_model=List[Tag])
+async def delete_tags(
+    tags: List[Tag],
+    includeRelated: Optional[bool] = False,
+    tags_service: TagStore = Depends(get_tag_store),
+):
     """
     Delete several tags
     """
     logger.info("DELETE /tags/ tags=%s", tags)
-    tags_service = TagsService()
-
-    result = []
-    for tag in tags:
-        result.extend(
-            _delete_tag(
-                tags_service=tags_service, tag=tag, include_related=includeRelated
-            )
-        )
+    return await tags_service.delete_tags(_with_related_tags(tags, includeRelated))
 
 
-@app.get("/tagGroups", response_model=List[str], deprecated=True)
-def search_tag_groups(nameLike: Optional[str] = None):
+@router.get("/tagGroups", response_model=List[str], deprecated=True)
+async def search_tag_groups(
+    nameLike: Optional[str] = None,
+    tags_service: TagStore = Depends(get_tag_store),
+    if_none_match: Optional[str] = Header(None),
+    accept_encoding: Optional[str] = Header(None),
+):
     """
     Get tag group names
     """
-    tags_service = TagsService()
-    groups = [tag_group.group_name for tag_group in tags_service.all_tag_groups()]
+    all_groups = await tags_service.all_tag_groups()
+    groups = [tag_group.group_name for tag_group in all_groups]
     if nameLike:
         groups = [group for group in groups if nameLike.lower() in group.lower()]
-    return groups
+    return _tags_response(ORJSONResponse(groups), accept_encoding, if_none_match)
 
 
-@app.get("/group/{groupName}", response_model=TagGroup)
-def get_group(groupName: str):
+@router.get("/group/{groupName}", response_model=TagGroup)
+async def get_group(
+    groupName: str,
+    tags_service: TagStore = Depends(get_tag_store),
+    if_none_match: Optional[str] = Header(None),
+    accept_encoding: Optional[str] = Header(None),
+):
     """
     Get a tag group
     """
-    tags_service = TagsService()
-    return tags_service.get_tag_group(groupName)
+    group = await tags_service.get_tag_group(groupName)
+    return _tags_response(
+        ORJSONResponse(jsonable_encoder(group)), accept_encoding, if_none_match
+    )
 
 
-@app.delete("/group", response_model=TagGroup)
-def delete_group(group: TagGroup):
+@router.delete("/group", response_model=TagGroup)
+async def delete_group(
+    group: TagGroup, tags_service: TagStore = Depends(get_tag_store)
+):
     """
     Delete a tag group and all connected tags
     """
-    tags_service = TagsService()
-    tags_service.delete_tag_group(group, delete_tags=True)
+    deleted = await tags_service.delete_tag_group(group, delete_tags=True)
+    logger.info("Deleted group %s and %s tags", group.group_name, deleted)
     return group
 
 
-@app.put("/group", response_model=TagGroup)
-def put_group(group: TagGroup):
+@router.put("/group", response_model=TagGroup)
+async def put_group(group: TagGroup, tags_service: TagStore = Depends(get_tag_store)):
     """
     Create/update a group
     """
     logger.info("Putting tag group: %s", group)
-    tags_service = TagsService()
-    tags_service.add_tag_group(group)
+    await tags_service.add_tag_group(group)
     return group
 
 
-@app.get("/groups", response_model=List[TagGroup])
-def search_groups(nameLike: Optional[str] = None, hasItems: Optional[str] = None):
+@router.get("/groups", response_model=List[TagGroup])
+async def search_groups(
+    nameLike: Optional[str] = None,
+    hasItems: Optional[str] = None,
+    tags_service: TagStore = Depends(get_tag_store),
+    if_none_match: Optional[str] = Header(None),
+    accept_encoding: Optional[str] = Header(None),
+):
     """
     Get tag groups
     """
-    tags_service = TagsService()
-    groups = tags_service.all_tag_groups()
+    if hasItems is not None:
+        items_set = set(_parse_item_ids(hasItems, "hasItems"))
+        if not items_set:
+            raise _invalid_query("hasItems", "Expected at least one item ID")
+        groups, group_names = await asyncio.gather(
+            tags_service.all_tag_groups(),
+            _get_group_names_with_items(tags_service, items_set),
+        )
+        groups = [group for group in groups if group.group_name in group_names]
+    else:
+        groups = await tags_service.all_tag_groups()
 
     if nameLike:
         groups = [
             group for group in groups if nameLike.lower() in group.group_name.lower()
         ]
 
-    if hasItems is not None:
-        items_set = {int(item_id) for item_id in hasItems.split(",")}
-        group_tags = {
-            group.group_name: {
-                tag.item_id
-                for tag in tags_service.get_tags_by_group_name(group.group_name)
-            }
-            for group in groups
-        }
-        groups = [
-            group for group in groups if items_set <= group_tags[group.group_name]
-        ]
+    return _tags_response(
+        ORJSONResponse(jsonable_encoder(groups)), accept_encoding, if_none_match
+    )
+
+
+def create_app(tag_store: Optional[TagStore] = None) -> FastAPI:
+    """
+    Build the API over a tag store, by default DynamoDB
+    """
+    app = FastAPI(default_response_class=ORJSONResponse)
+    app.state.tag_store = tag_store
+
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=["*"],
+        allow_credentials=True,
+        allow_methods=["*"],
+        allow_headers=["*"],
+    )
+    app.add_event_handler("shutdown", close_dynamodb)
+    app.include_router(router)
+    return app
+
+
+def configured_tag_store() -> Optional[TagStore]:
+    """
+    Open the tag store that the environment configures, or None for DynamoDB
+    """
+    if TAG_STORE == "dynamodb":
+        return None
+    if TAG_STORE == "sqlite":
+        return SQLiteTagStore(SQLITE_PATH)
+    if TAG_STORE == "memory":
+        return MemoryTagStore()
+    raise EnvironmentError(
+        f"Unknown tag store {TAG_STORE}, expected dynamodb, sqlite or memory"
+    )
 
-    return groups
 
+app = create_app(configured_tag_store())
 
-#: Handler for deploying to AWS Lambda
-handler = Mangum(app)
+#: Handler for deploying to AWS Lambda. Mangum would run the app's startup and
+#: shutdown for every invocation, closing the DynamoDB connections that warm
+#: invocations are meant to reuse, so the lifespan is left to the process.
+handler = Mangum(app, lifespan="off")
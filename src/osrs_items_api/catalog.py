@@ -0,0 +1,275 @@
+from collections import defaultdict
+from itertools import chain
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+    overload,
+)
+
+import orjson
+from osrsbox.items_api.all_items import AllItems
+from osrsbox.items_api.item_properties import ItemProperties
+
+from osrs_items_api.name_index import NameIndex
+from osrs_items_api.types import Item
+
+
+class ItemRecord(NamedTuple):
+    """
+    The properties of an item in the item database that the catalog indexes by.
+    Full items are only built from these when they're first needed.
+    """
+
+    #: Ingame ID of the item
+    item_id: int
+
+    #: Name of the item
+    name: str
+
+    #: If the item is members-only
+    members: bool
+
+    #: ID of the main item, if this is a related item like a stacked or noted form
+    linked_id_item: Optional[int] = None
+
+    #: Name of the item on the wiki, if any
+    wiki_name: Optional[str] = None
+
+    @classmethod
+    def from_osrsbox(cls, item: ItemProperties) -> "ItemRecord":
+        return cls(
+            item_id=item.id,
+            name=item.name,
+            members=item.members,
+            linked_id_item=item.linked_id_item,
+            wiki_name=item.wiki_name,
+        )
+
+
+class CatalogItems(Sequence[Item]):
+    """
+    A sequence of catalog items, built from their records when first accessed
+    """
+
+    def __init__(self, catalog: "ItemCatalog", item_ids: Sequence[int]):
+        self._catalog = catalog
+        self._item_ids = item_ids
+
+    def __len__(self) -> int:
+        return len(self._item_ids)
+
+    @overload
+    def __getitem__(self, index: int) -> Item:
+        ...
+
+    @overload
+    def __getitem__(self, index: slice) -> List[Item]:
+        ...
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[Item, List[Item]]:
+        if isinstance(index, slice):
+            return [self._catalog.item(item_id) for item_id in self._item_ids[index]]
+        return self._catalog.item(self._item_ids[index])
+
+    def __iter__(self) -> Iterator[Item]:
+        return (self._catalog.item(item_id) for item_id in self._item_ids)
+
+
+class ItemCatalog:
+    """
+    Precomputed indexes over the item database.
+
+    Built once at startup, so that requests can read from ready-made sorted
+    sequences rather than re-deriving main items each time. Indexes are built
+    from lightweight item records, and full items are only built (and then
+    kept) when a request first needs them.
+    """
+
+    def __init__(self, records: Iterable[ItemRecord], load_icon: Callable[[int], str]):
+        self._load_icon = load_icon
+        self._records: Dict[int, ItemRecord] = {}
+        self._items: Dict[int, Item] = {}
+        self._items_json: Dict[int, bytes] = {}
+
+        related_ids: Dict[int, List[int]] = defaultdict(list)
+        for record in records:
+            self._records[record.item_id] = record
+            if record.linked_id_item:
+                related_ids[record.linked_id_item].append(record.item_id)
+
+        #: IDs of all main items, sorted
+        self.main_ids: List[int] = sorted(
+            record.item_id
+            for record in self._records.values()
+            if not record.linked_id_item
+        )
+
+        #: IDs of members-only main items, sorted
+        self.members_ids: List[int] = [
+            item_id for item_id in self.main_ids if self._records[item_id].members
+        ]
+
+        #: IDs of free-to-play main items, sorted
+        self.free_ids: List[int] = [
+            item_id for item_id in self.main_ids if not self._records[item_id].members
+        ]
+
+        #: All main items, sorted by ID
+        self.main_items: Sequence[Item] = CatalogItems(self, self.main_ids)
+
+        #: Members-only main items, sorted by ID
+        self.members_items: Sequence[Item] = CatalogItems(self, self.members_ids)
+
+        #: Free-to-play main items, sorted by ID
+        self.free_items: Sequence[Item] = CatalogItems(self, self.free_ids)
+
+        #: Position of each main item in ``main_items``, by item ID
+        self.positions: Dict[int, int] = {
+            item_id: position for position, item_id in enumerate(self.main_ids)
+        }
+
+        #: IDs of related items, such as stacked or noted forms, by main item ID
+        self.related_ids: Dict[int, Tuple[int, ...]] = {
+            item_id: tuple(sorted(ids)) for item_id, ids in related_ids.items()
+        }
+
+        #: IDs of all main items and their related items, sorted
+        self.main_ids_with_related: List[int] = self._with_related(self.main_ids)
+
+        #: IDs of free-to-play main items and their related items, sorted
+        self.free_ids_with_related: List[int] = self._with_related(self.free_ids)
+
+        #: Name search index over main items, by ingame and wiki names. Built with
+        #: the catalog, so that no search request pays for building it.
+        self.name_index = NameIndex(
+            (record.name,)
+            if not record.wiki_name or record.wiki_name == record.name
+            else (record.name, record.wiki_name)
+            for record in map(self._records.__getitem__, self.main_ids)
+        )
+
+    def _with_related(self, item_ids: Iterable[int]) -> List[int]:
+        return sorted(
+            chain.from_iterable(
+                (item_id, *self.related_ids.get(item_id, ())) for item_id in item_ids
+            )
+        )
+
+    def sorted_with_related(self, item_ids: Sequence[int]) -> Optional[List[int]]:
+        """
+        Get the precomputed, sorted IDs of ``main_ids`` or ``free_ids`` merged
+        with their related items, or None for any other list of IDs
+        """
+        if item_ids is self.main_ids:
+            return self.main_ids_with_related
+        if item_ids is self.free_ids:
+            return self.free_ids_with_related
+        return None
+
+    @classmethod
+    def from_osrsbox(cls, osrsbox_items: AllItems) -> "ItemCatalog":
+        """
+        Build a catalog from the osrsbox item database
+        """
+        return cls(
+            (ItemRecord.from_osrsbox(osb_item) for osb_item in osrsbox_items),
+            load_icon=lambda item_id: osrsbox_items[item_id].icon,
+        )
+
+    def __len__(self) -> int:
+        return len(self.main_items)
+
+    def __contains__(self, item_id: int) -> bool:
+        return item_id in self._records
+
+    def item(self, item_id: int) -> Item:
+        """
+        Get any item by ID, raising KeyError if it doesn't exist
+        """
+        try:
+            return self._items[item_id]
+        except KeyError:
+            record = self._records[item_id]
+
+        item = Item(
+            item_id=record.item_id,
+            name=record.name,
+            members=record.members,
+            icon_base64=self._load_icon(item_id),
+        )
+        self._items[item_id] = item
+        return item
+
+    def project(self, item_id: int, fields: Dict[str, str]) -> Dict[str, Any]:
+        """
+        Get only some fields of any item by ID, given as a mapping of camelCase
+        field names to item attribute names, raising KeyError if it doesn't
+        exist. Fields are read from the item's record where they can be, so its
+        icon is only loaded if it's asked for.
+        """
+        source: Union[Item, ItemRecord]
+        if "icon_base64" in fields.values():
+            source = self.item(item_id)
+        else:
+            source = self._records[item_id]
+        return {field: getattr(source, name) for field, name in fields.items()}
+
+    def item_json(self, item_id: int) -> bytes:
+        """
+        Get the camelCase JSON of any item by ID, raising KeyError if it doesn't
+        exist. Items are immutable, so each is only serialised once.
+        """
+        try:
+            return self._items_json[item_id]
+        except KeyError:
+            item = self.item(item_id)
+
+        item_json = orjson.dumps(item.dict(by_alias=True))
+        self._items_json[item_id] = item_json
+        return item_json
+
+    def items_json(self, item_ids: Iterable[int]) -> bytes:
+        """
+        Get a JSON array of items by ID, joined from their serialised JSON
+        """
+        return b"[" + b",".join(map(self.item_json, item_ids)) + b"]"
+
+    def is_main_item(self, item_id: int) -> bool:
+        """
+        Whether an item ID belongs to a main item
+        """
+        return item_id in self.positions
+
+    def is_members_item(self, item_id: int) -> bool:
+        """
+        Whether an item is members-only, raising KeyError if it doesn't exist
+        """
+        return self._records[item_id].members
+
+    def main_item_id(self, item_id: int) -> int:
+        """
+        Get the ID of the main item that an item is a form of, which is its own
+        ID for main items. Raises KeyError if the item doesn't exist.
+        """
+        return self._records[item_id].linked_id_item or item_id
+
+    def get(self, item_id: int) -> Optional[Item]:
+        """
+        Get a main item by ID, or None if it isn't a main item
+        """
+        return self.item(item_id) if item_id in self.positions else None
+
+    def get_related_ids(self, item_id: int) -> Tuple[int, ...]:
+        """
+        Get the IDs of items related to a main item, in order of ID
+        """
+        return self.related_ids.get(item_id, ())
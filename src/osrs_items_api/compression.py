@@ -0,0 +1,85 @@
+import gzip
+from collections import OrderedDict
+from typing import List, Optional, Tuple
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - brotli is an optional extra
+    brotli = None
+
+#: Smallest body worth compressing, in bytes
+MIN_COMPRESS_SIZE = 1024
+
+#: Compression levels, favouring speed as bodies are compressed per request
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 4
+
+#: Supported content encodings, most preferred first. Brotli is only supported
+#: if the optional brotli package is installed.
+ENCODINGS: List[str] = (["br"] if brotli is not None else []) + ["gzip"]
+
+
+def accepted_encoding(accept_encoding: Optional[str]) -> Optional[str]:
+    """
+    Get the most preferred supported encoding that an Accept-Encoding header
+    accepts, or None if bodies should be sent as they are
+    """
+    if not accept_encoding:
+        return None
+
+    accepted = {}
+    for part in accept_encoding.split(","):
+        name, *params = (token.strip() for token in part.split(";"))
+        quality = 1.0
+        for param in params:
+            key, _, value = param.partition("=")
+            if key.strip() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        accepted[name.lower()] = quality
+
+    for encoding in ENCODINGS:
+        if accepted.get(encoding, accepted.get("*", 0.0)) > 0:
+            return encoding
+    return None
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    """
+    Compress a body with a supported encoding
+    """
+    if encoding == "br" and brotli is not None:
+        return brotli.compress(body, quality=BROTLI_QUALITY)
+    if encoding == "gzip":
+        return gzip.compress(body, compresslevel=GZIP_LEVEL)
+    raise ValueError(f"Unsupported encoding {encoding}")
+
+
+class CompressedBodies:
+    """
+    Bodies kept after being compressed, by a key that identifies the
+    uncompressed body (such as a strong ETag) and their encoding.
+
+    Only the most recently used few are kept, as they can be several MB each.
+    """
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._bodies: "OrderedDict[Tuple[str, str], bytes]" = OrderedDict()
+
+    def get(self, key: str, encoding: str) -> Optional[bytes]:
+        body = self._bodies.get((key, encoding))
+        if body is not None:
+            self._bodies.move_to_end((key, encoding))
+        return body
+
+    def put(self, key: str, encoding: str, body: bytes):
+        self._bodies[(key, encoding)] = body
+        self._bodies.move_to_end((key, encoding))
+        while len(self._bodies) > self.max_entries:
+            self._bodies.popitem(last=False)
+
+    def clear(self):
+        self._bodies.clear()
@@ -1,11 +1,18 @@
 import os
+from pathlib import Path
 from typing import Optional
 
+#: Where tags are stored: "dynamodb", "sqlite" (at SQLITE_PATH) or "memory"
+TAG_STORE: str = os.environ.get("OSRS_TAG_STORE", "dynamodb")
+
+#: Path of the SQLite database that tags are stored in, if TAG_STORE is "sqlite"
+SQLITE_PATH: Path = Path(os.environ.get("OSRS_SQLITE_PATH", "tags.sqlite3"))
+
 #: Name of the item tags table in DynamoDB
-TAGS_TABLE_NAME: str = os.environ["OSRS_TAGS_TABLE_NAME"]
+TAGS_TABLE_NAME: str = os.environ.get("OSRS_TAGS_TABLE_NAME", "tags")
 
 #: Name of the item tags table in DynamoDB
-TAG_GROUPS_TABLE_NAME: str = os.environ["OSRS_TAG_GROUPS_TABLE_NAME"]
+TAG_GROUPS_TABLE_NAME: str = os.environ.get("OSRS_TAG_GROUPS_TABLE_NAME", "tag_groups")
 
 #: Name of the bank tags index of the item tags table in DynamoDB
 BANK_TAGS_INDEX_NAME: str = "bank-tags"
@@ -15,3 +22,37 @@ AWS_REGION: Optional[str] = os.environ.get("AWS_REGION")
 
 #: Optional endpoint for a local DynamoDB instance, taking precedence over AWS_REGION
 LOCAL_DYNAMODB_ENDPOINT: Optional[str] = os.environ.get("LOCAL_DYNAMODB_ENDPOINT")
+
+#: Path of the compiled catalog snapshot (see scripts/build-catalog-snapshot.py). If
+#: there's no file at this path, the osrsbox item database is loaded instead.
+CATALOG_SNAPSHOT_PATH: Path = Path(
+    os.environ.get(
+        "OSRS_CATALOG_SNAPSHOT_PATH", Path(__file__).parent / "data" / "catalog.bin"
+    )
+)
+
+#: Most connections kept open to DynamoDB at once, shared by all requests
+DYNAMODB_MAX_POOL_CONNECTIONS: int = int(
+    os.environ.get("OSRS_DYNAMODB_MAX_POOL_CONNECTIONS", 50)
+)
+
+#: Seconds to wait for a connection to DynamoDB to be made, or for a response
+DYNAMODB_CONNECT_TIMEOUT: float = float(
+    os.environ.get("OSRS_DYNAMODB_CONNECT_TIMEOUT", 1)
+)
+DYNAMODB_READ_TIMEOUT: float = float(os.environ.get("OSRS_DYNAMODB_READ_TIMEOUT", 5))
+
+#: botocore retry mode and maximum attempts (including the first) for DynamoDB calls
+DYNAMODB_RETRY_MODE: str = os.environ.get("OSRS_DYNAMODB_RETRY_MODE", "standard")
+DYNAMODB_MAX_ATTEMPTS: int = int(os.environ.get("OSRS_DYNAMODB_MAX_ATTEMPTS", 3))
+
+#: Seconds the in-process snapshot of all tag groups is used for before checking
+#: whether the groups have changed
+TAG_GROUPS_CACHE_TTL: float = float(os.environ.get("OSRS_TAG_GROUPS_CACHE_TTL", 30))
+
+#: Key of the sentinel item in the tag groups table that counts writes to tag
+#: groups. It isn't a tag group, and can't be used as a group name.
+TAG_GROUPS_VERSION_KEY: str = "\0version"
+
+#: Number of segments whole-table scans are split into and read concurrently
+SCAN_SEGMENTS: int = int(os.environ.get("OSRS_SCAN_SEGMENTS", 4))
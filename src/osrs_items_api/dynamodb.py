@@ -1,13 +1,42 @@
+import asyncio
 from decimal import Decimal
 from typing import Any, Dict
 
-import boto3
+import aioboto3
+from aiobotocore.config import AioConfig
 
-from osrs_items_api.constants import AWS_REGION, LOCAL_DYNAMODB_ENDPOINT
+from osrs_items_api.constants import (
+    AWS_REGION,
+    DYNAMODB_CONNECT_TIMEOUT,
+    DYNAMODB_MAX_ATTEMPTS,
+    DYNAMODB_MAX_POOL_CONNECTIONS,
+    DYNAMODB_READ_TIMEOUT,
+    DYNAMODB_RETRY_MODE,
+    LOCAL_DYNAMODB_ENDPOINT,
+)
 
+#: Shared DynamoDB resources, by the event loop they were opened in. Connections
+#: can't be shared between event loops, so there's one per loop, which in
+#: practice is one per process.
+_resources: Dict[asyncio.AbstractEventLoop, "asyncio.Future[Any]"] = {}
 
-def dynamodb():
-    config = {}
+
+def dynamodb_config() -> AioConfig:
+    """
+    Client config for DynamoDB: a pool of kept-alive connections, with timeouts
+    and retries
+    """
+    return AioConfig(
+        max_pool_connections=DYNAMODB_MAX_POOL_CONNECTIONS,
+        tcp_keepalive=True,
+        connect_timeout=DYNAMODB_CONNECT_TIMEOUT,
+        read_timeout=DYNAMODB_READ_TIMEOUT,
+        retries={"mode": DYNAMODB_RETRY_MODE, "max_attempts": DYNAMODB_MAX_ATTEMPTS},
+    )
+
+
+async def _open_dynamodb() -> Any:
+    config: Dict[str, Any] = {"config": dynamodb_config()}
     if LOCAL_DYNAMODB_ENDPOINT is not None:
         config["endpoint_url"] = LOCAL_DYNAMODB_ENDPOINT
     elif AWS_REGION is not None:
@@ -16,7 +45,32 @@ def dynamodb():
         msg = "Please set either AWS_REGION or LOCAL_DYNAMODB_ENDPOINT"
         raise EnvironmentError(msg)
 
-    return boto3.resource("dynamodb", **config)
+    return await aioboto3.Session().resource("dynamodb", **config).__aenter__()
+
+
+async def dynamodb() -> Any:
+    """
+    Get the shared async DynamoDB resource, opening it on first use
+    """
+    loop = asyncio.get_running_loop()
+    if loop not in _resources:
+        _resources[loop] = asyncio.ensure_future(_open_dynamodb())
+
+    try:
+        return await asyncio.shield(_resources[loop])
+    except Exception:
+        # Let the next request try again rather than failing forever
+        _resources.pop(loop, None)
+        raise
+
+
+async def close_dynamodb():
+    """
+    Close the shared DynamoDB resource of the running event loop, if it's open
+    """
+    resource = _resources.pop(asyncio.get_running_loop(), None)
+    if resource is not None:
+        await (await resource).meta.client.close()
 
 
 def from_dynamodb(data: Dict[str, Any]) -> Dict[str, Any]:
@@ -0,0 +1,255 @@
+import base64
+import mmap
+import struct
+import zlib
+from hashlib import blake2b
+from pathlib import Path
+from typing import Generator, Iterable, List, Optional, Sequence, Tuple, Union
+
+from osrsbox.items_api.all_items import AllItems
+
+#: Identifies an icon store
+MAGIC = b"OSRSICON"
+
+#: Store format version
+VERSION = 1
+
+#: Store header: magic, version, number of icons
+_HEADER = struct.Struct("<8sII")
+
+#: Offset table entry: item ID, offset and length of the PNG data, width, height.
+#: Entries are sorted by item ID.
+_ENTRY = struct.Struct("<IIIHH")
+
+_PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+_PNG_CHUNK_HEADER = struct.Struct(">I4s")
+_PNG_IHDR = struct.Struct(">IIBBBBB")
+
+#: Bytes per pixel of 8-bit RGBA images, the only kind that can go in a sprite sheet
+_RGBA_BPP = 4
+
+
+class IconStore:
+    """
+    Read-only store of item icons as PNG bytes, backed by a prebuilt blob (e.g. a
+    memory-mapped file) with an offset table sorted by item ID.
+
+    Lookups binary search the offset table in place, so only the pages holding
+    the requested icons are ever read.
+    """
+
+    def __init__(self, buffer: Union[bytes, mmap.mmap, memoryview]):
+        magic, version, count = _HEADER.unpack_from(buffer, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError("Not an icon store, or an unsupported version of one")
+
+        self._buffer = buffer
+        self._count: int = count
+
+    @classmethod
+    def open(cls, path: Union[str, Path]) -> "IconStore":
+        """
+        Memory-map an icon store file
+        """
+        with open(path, "rb") as f:
+            return cls(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+
+    @staticmethod
+    def build(icons: Iterable[Tuple[int, bytes]]) -> bytes:
+        """
+        Build an icon store from (item ID, PNG bytes) pairs
+        """
+        sorted_icons = sorted(icons)
+        data_offset = _HEADER.size + _ENTRY.size * len(sorted_icons)
+
+        entries = []
+        offset = data_offset
+        for item_id, png in sorted_icons:
+            width, height = _png_size(png)
+            entries.append(_ENTRY.pack(item_id, offset, len(png), width, height))
+            offset += len(png)
+
+        return b"".join(
+            [
+                _HEADER.pack(MAGIC, VERSION, len(sorted_icons)),
+                *entries,
+                *(png for _, png in sorted_icons),
+            ]
+        )
+
+    def __len__(self) -> int:
+        return self._count
+
+    def _find(self, item_id: int) -> Optional[Tuple[int, int, int, int]]:
+        low, high = 0, self._count
+        while low < high:
+            middle = (low + high) // 2
+            entry_id, offset, length, width, height = _ENTRY.unpack_from(
+                self._buffer, _HEADER.size + middle * _ENTRY.size
+            )
+            if entry_id < item_id:
+                low = middle + 1
+            elif entry_id > item_id:
+                high = middle
+            else:
+                return offset, length, width, height
+        return None
+
+    def get(self, item_id: int) -> Optional[bytes]:
+        """
+        Get the PNG bytes of an item's icon, or None if there's no icon for it
+        """
+        entry = self._find(item_id)
+        if entry is None:
+            return None
+        offset, length, _, _ = entry
+        return bytes(self._buffer[offset : offset + length])
+
+    def sprite_sheet(self, item_ids: Sequence[int]) -> bytes:
+        """
+        Build a PNG sprite sheet of the icons of several items, stacked
+        vertically in the given order.
+
+        Every cell is as wide as the widest icon and as tall as the tallest, and
+        is left transparent for items without an icon.
+        """
+        icons = [self.get(item_id) for item_id in item_ids]
+        sizes = [_png_size(icon) for icon in icons if icon is not None]
+        width = max((w for w, _ in sizes), default=1)
+        height = max((h for _, h in sizes), default=1)
+
+        blank_row = bytes(1 + width * _RGBA_BPP)
+        rows: List[bytes] = []
+        for icon in icons:
+            icon_rows = [] if icon is None else _sprite_rows(icon, width)
+            rows.extend(icon_rows)
+            rows.extend([blank_row] * (height - len(icon_rows)))
+
+        return _png(width, height * len(icons), b"".join(rows))
+
+
+def osrsbox_icons(
+    osrsbox_items: AllItems,
+) -> Generator[Tuple[int, bytes], None, None]:
+    """
+    Get the PNG icons of all items in the osrsbox item database, by item ID
+    """
+    for osb_item in osrsbox_items:
+        yield osb_item.id, base64.b64decode(osb_item.icon)
+
+
+def etag(*parts: bytes) -> str:
+    """
+    Strong ETag of one or more icons, or any other content
+    """
+    digest = blake2b(digest_size=16)
+    for part in parts:
+        digest.update(part)
+    return f'"{digest.hexdigest()}"'
+
+
+def _png_chunks(png: bytes) -> Iterable[Tuple[bytes, bytes]]:
+    if not png.startswith(_PNG_SIGNATURE):
+        raise ValueError("Not a PNG image")
+
+    offset = len(_PNG_SIGNATURE)
+    while offset < len(png):
+        length, chunk_type = _PNG_CHUNK_HEADER.unpack_from(png, offset)
+        start = offset + _PNG_CHUNK_HEADER.size
+        yield chunk_type, png[start : start + length]
+        # Skip the chunk's CRC
+        offset = start + length + 4
+
+
+def _png_size(png: bytes) -> Tuple[int, int]:
+    width, height, *_ = _PNG_IHDR.unpack_from(png, len(_PNG_SIGNATURE) + 8)
+    return width, height
+
+
+def _sprite_rows(png: bytes, width: int) -> List[bytes]:
+    """
+    Get the scanlines of an 8-bit RGBA PNG as rows of a sprite sheet of the given
+    width.
+
+    Scanlines are kept filtered where possible, as filters only refer to the
+    previous row of the same icon. Only the first row, which is filtered against
+    an implicit row of zeros, and icons that need padding are unfiltered.
+    """
+    idat = []
+    for chunk_type, data in _png_chunks(png):
+        if chunk_type == b"IHDR":
+            icon_width, _, depth, colour, _, _, interlace = _PNG_IHDR.unpack(data)
+            if (depth, colour, interlace) != (8, 6, 0):
+                raise ValueError("Only non-interlaced 8-bit RGBA icons are supported")
+        elif chunk_type == b"IDAT":
+            idat.append(data)
+
+    raw = zlib.decompress(b"".join(idat))
+    stride = 1 + icon_width * _RGBA_BPP
+    rows = [raw[i : i + stride] for i in range(0, len(raw), stride)]
+
+    if icon_width == width:
+        first = _unfilter(rows[0][0], rows[0][1:], bytes(stride - 1))
+        return [b"\x00" + first, *rows[1:]]
+
+    padding = bytes((width - icon_width) * _RGBA_BPP)
+    unfiltered = []
+    prior = bytes(stride - 1)
+    for row in rows:
+        prior = _unfilter(row[0], row[1:], prior)
+        unfiltered.append(b"\x00" + prior + padding)
+    return unfiltered
+
+
+def _unfilter(filter_type: int, row: bytes, prior: bytes) -> bytes:
+    """
+    Reverse the PNG filter of a scanline, given the unfiltered previous one
+    """
+    if filter_type == 0:
+        return row
+
+    out = bytearray(row)
+    for i in range(len(out)):
+        left = out[i - _RGBA_BPP] if i >= _RGBA_BPP else 0
+        up = prior[i]
+        if filter_type == 1:
+            out[i] = (out[i] + left) & 0xFF
+        elif filter_type == 2:
+            out[i] = (out[i] + up) & 0xFF
+        elif filter_type == 3:
+            out[i] = (out[i] + (left + up) // 2) & 0xFF
+        elif filter_type == 4:
+            up_left = prior[i - _RGBA_BPP] if i >= _RGBA_BPP else 0
+            estimate = left + up - up_left
+            distances = (
+                abs(estimate - left),
+                abs(estimate - up),
+                abs(estimate - up_left),
+            )
+            if distances[0] <= distances[1] and distances[0] <= distances[2]:
+                predictor = left
+            elif distances[1] <= distances[2]:
+                predictor = up
+            else:
+                predictor = up_left
+            out[i] = (out[i] + predictor) & 0xFF
+    return bytes(out)
+
+
+def _png(width: int, height: int, scanlines: bytes) -> bytes:
+    def chunk(chunk_type: bytes, data: bytes) -> bytes:
+        crc = zlib.crc32(chunk_type + data)
+        return (
+            _PNG_CHUNK_HEADER.pack(len(data), chunk_type)
+            + data
+            + struct.pack(">I", crc)
+        )
+
+    return b"".join(
+        [
+            _PNG_SIGNATURE,
+            chunk(b"IHDR", _PNG_IHDR.pack(width, height, 8, 6, 0, 0, 0)),
+            chunk(b"IDAT", zlib.compress(scanlines)),
+            chunk(b"IEND", b""),
+        ]
+    )
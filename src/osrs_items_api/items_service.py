@@ -1,26 +1,79 @@
-from typing import Generator, Iterable
+from bisect import bisect_right
+from functools import lru_cache
+from heapq import merge, nsmallest
+from importlib.metadata import version
+from itertools import islice
+from typing import Dict, Generator, Iterable, List, Optional, Sequence, Tuple
 
 from osrsbox import items_api
+from osrsbox.items_api.all_items import AllItems
 
+from osrs_items_api.catalog import ItemCatalog
+from osrs_items_api.constants import CATALOG_SNAPSHOT_PATH
+from osrs_items_api.icon_store import IconStore, osrsbox_icons
+from osrs_items_api.snapshot import CatalogSnapshot
 from osrs_items_api.types import Item
 
-osrsbox_items = items_api.load()
+
+@lru_cache(maxsize=None)
+def osrsbox_items() -> AllItems:
+    """
+    Load the osrsbox item database. This parses a large JSON file, so is only
+    done when there's no catalog snapshot to read instead.
+    """
+    return items_api.load()
+
+
+#: Compiled catalog snapshot, if one has been built
+snapshot = (
+    CatalogSnapshot.open(CATALOG_SNAPSHOT_PATH)
+    if CATALOG_SNAPSHOT_PATH.is_file()
+    else None
+)
+
+#: Version of the item database, which item data only changes with. Snapshots
+#: record the version they were built from, which may not be the one installed.
+catalog_version: str = (
+    snapshot.source_version if snapshot is not None else version("osrsbox")
+)
+
+#: Precomputed item indexes, built once at startup
+catalog = (
+    snapshot.catalog()
+    if snapshot is not None
+    else ItemCatalog.from_osrsbox(osrsbox_items())
+)
 
 
 def get_item(item_id: int) -> Item:
     """
     Get an item by ID
     """
-    return Item.from_osrsbox(osrsbox_items.lookup_by_item_id(item_id))
+    return catalog.item(item_id)
+
+
+def lookup_item_ids(item_ids: Iterable[int]) -> Tuple[List[int], List[int]]:
+    """
+    Look up any items by ID in one pass over the catalog's ID index.
+
+    Returns the IDs that exist and those that don't, each without duplicates and
+    in the order they were given.
+    """
+    found: Dict[int, None] = {}
+    missing: Dict[int, None] = {}
+    for item_id in item_ids:
+        if item_id in catalog:
+            found[item_id] = None
+        else:
+            missing[item_id] = None
+    return list(found), list(missing)
 
 
 def main_items() -> Generator[Item, None, None]:
     """
     Get main items, excluding things like stacked and noted forms
     """
-    yield from filter_main_items(
-        Item.from_osrsbox(osb_item) for osb_item in osrsbox_items
-    )
+    yield from catalog.main_items
 
 
 def filter_main_items(items: Iterable[Item]) -> Generator[Item, None, None]:
@@ -28,25 +81,171 @@ def filter_main_items(items: Iterable[Item]) -> Generator[Item, None, None]:
     Filter items for only main items
     """
     for item in items:
-        osb_item = osrsbox_items.lookup_by_item_id(item.item_id)
-        if not osb_item.linked_id_item:
+        if catalog.is_main_item(item.item_id):
             yield item
 
 
-def search_items(keyword: str) -> Generator[Item, None, None]:
+def search_item_ids(keyword: str, prefix: bool = False) -> List[int]:
+    """
+    Search IDs of main items with a name that contains, or optionally starts
+    with, a keyword, in order of ID
+    """
+    name_index = catalog.name_index
+    if prefix:
+        positions = name_index.search_prefix(keyword)
+    else:
+        positions = name_index.search(keyword)
+
+    return [catalog.main_ids[position] for position in positions]
+
+
+def search_items(keyword: str, prefix: bool = False) -> Generator[Item, None, None]:
+    """
+    Search main items with a name that contains, or optionally starts with, a
+    keyword, in order of ID
+    """
+    for item_id in search_item_ids(keyword, prefix=prefix):
+        yield catalog.item(item_id)
+
+
+def _related_count(item_ids: Iterable[int]) -> int:
+    return sum(len(catalog.get_related_ids(item_id)) for item_id in item_ids)
+
+
+def page_by_id(
+    item_ids: Sequence[int],
+    include_related: bool = False,
+    after: Optional[int] = None,
+    offset: int = 0,
+    limit: Optional[int] = None,
+) -> Tuple[List[int], int]:
     """
-    Search main items that match a keyword
+    Get a page of the given sorted main item IDs, optionally merged with the
+    IDs of their related items, in order of ID. Pages start after the ``after``
+    item ID (if given), then skip ``offset`` items.
+
+    Returns the page and the total number of items in all pages.
     """
-    yield from filter_main_items(
-        Item.from_osrsbox(osb_item)
-        for osb_item in osrsbox_items.search_item_names(keyword=keyword)
+    if include_related:
+        # Unfiltered searches page through a merged list built with the catalog
+        merged_ids = catalog.sorted_with_related(item_ids)
+        if merged_ids is not None:
+            item_ids, include_related = merged_ids, False
+
+    start = 0 if after is None else bisect_right(item_ids, after)
+    stop = None if limit is None else start + offset + limit
+    if not include_related:
+        return list(item_ids[start + offset : stop]), len(item_ids)
+
+    related_ids = sorted(
+        related_id
+        for item_id in item_ids
+        for related_id in catalog.get_related_ids(item_id)
     )
+    related_start = 0 if after is None else bisect_right(related_ids, after)
+    sorted_ids = merge(item_ids[start:], related_ids[related_start:])
+
+    stop = None if limit is None else offset + limit
+    return list(islice(sorted_ids, offset, stop)), len(item_ids) + len(related_ids)
+
+
+def page_by_relevance(
+    item_ids: Sequence[int],
+    keyword: str,
+    include_related: bool = False,
+    after: Optional[int] = None,
+    offset: int = 0,
+    limit: Optional[int] = None,
+) -> Tuple[List[int], int]:
+    """
+    Get a page of the given main item IDs, ordered by how well their names
+    match a keyword (exact matches, then prefix matches, then others) and then
+    by ID. Related items optionally follow each main item. Pages start after
+    the ``after`` item ID (if given), then skip ``offset`` items.
+
+    Only the items needed for the page are fully ordered, so small pages of
+    large results are cheap.
+
+    Returns the page and the total number of items in all pages.
+    """
+    name_index = catalog.name_index
+
+    def relevance(item_id: int) -> Tuple[int, int]:
+        position = catalog.positions[item_id]
+        return name_index.relevance(keyword, position), item_id
+
+    total_count = len(item_ids)
+    if include_related:
+        total_count += _related_count(item_ids)
+
+    # The rest of the group of the item the page starts after
+    page_ids: List[int] = []
+    candidates: Iterable[int] = item_ids
+    if after is not None:
+        after_main_id = catalog.main_item_id(after)
+        after_relevance = relevance(after_main_id)
+        candidates = (
+            item_id for item_id in item_ids if relevance(item_id) > after_relevance
+        )
+        if include_related:
+            group_ids = (after_main_id, *catalog.get_related_ids(after_main_id))
+            page_ids.extend(group_ids[group_ids.index(after) + 1 :])
+
+    if limit is None:
+        ranked_ids = sorted(candidates, key=relevance)
+    else:
+        ranked_ids = nsmallest(offset + limit, candidates, key=relevance)
+
+    for item_id in ranked_ids:
+        page_ids.append(item_id)
+        if include_related:
+            page_ids.extend(catalog.get_related_ids(item_id))
+
+    stop = None if limit is None else offset + limit
+    return page_ids[offset:stop], total_count
 
 
 def related_items(item: Item) -> Generator[Item, None, None]:
     """
     Get items related to a main item, such as stacked or noted forms
     """
-    for related_item in osrsbox_items:
-        if related_item.linked_id_item == item.item_id:
-            yield Item.from_osrsbox(related_item)
+    for related_id in catalog.get_related_ids(item.item_id):
+        yield get_item(related_id)
+
+
+def related_item_ids_many(item_ids: Iterable[int]) -> List[int]:
+    """
+    Get the IDs of items related to any of several main items, in a single pass
+    over the related items index
+    """
+    return [
+        related_id
+        for item_id in item_ids
+        for related_id in catalog.get_related_ids(item_id)
+    ]
+
+
+def related_items_many(item_ids: Iterable[int]) -> List[Item]:
+    """
+    Get items related to any of several main items, in a single pass over the
+    related items index
+    """
+    return [get_item(related_id) for related_id in related_item_ids_many(item_ids)]
+
+
+@lru_cache(maxsize=None)
+def icon_store() -> IconStore:
+    """
+    Get the icon store, from the catalog snapshot if there is one or else built
+    in memory on first use
+    """
+    if snapshot is not None:
+        return snapshot.icons
+    return IconStore(IconStore.build(osrsbox_icons(osrsbox_items())))
+
+
+def get_icon(item_id: int) -> Optional[bytes]:
+    """
+    Get the PNG icon of an item, or None if the item doesn't exist
+    """
+    return icon_store().get(item_id)
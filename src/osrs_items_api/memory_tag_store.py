@@ -0,0 +1,93 @@
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Set
+
+from osrs_items_api.logging import get_logger
+from osrs_items_api.types import Item, Tag, TagGroup
+
+logger = get_logger()
+
+
+class MemoryTagStore:
+    """
+    Keeps item tags and tag groups in memory, indexed both by item and by group,
+    e.g. for tests, benchmarks and throwaway local servers. Nothing is persisted.
+
+    Tags are listed in the same order as DynamoDB's tables and index list them:
+    by group name for an item, and by item ID for a group.
+    """
+
+    def __init__(self):
+        self._item_groups: Dict[int, Set[str]] = defaultdict(set)
+        self._group_items: Dict[str, Set[int]] = defaultdict(set)
+        self._tag_groups: Dict[str, TagGroup] = {}
+
+    async def add_tag(self, tag: Tag) -> Tag:
+        await self.add_tags([tag])
+        return tag
+
+    async def add_tags(self, tags: Iterable[Tag]) -> List[Tag]:
+        unique_tags = list(dict.fromkeys(tags))
+        logger.info("Creating %s tags", len(unique_tags))
+        for tag in unique_tags:
+            self._item_groups[tag.item_id].add(tag.group_name)
+            self._group_items[tag.group_name].add(tag.item_id)
+            if tag.group_name not in self._tag_groups:
+                self._tag_groups[tag.group_name] = TagGroup(group_name=tag.group_name)
+        return unique_tags
+
+    async def delete_tag(self, tag: Tag) -> Tag:
+        await self.delete_tags([tag])
+        return tag
+
+    async def delete_tags(self, tags: Iterable[Tag]) -> List[Tag]:
+        unique_tags = list(dict.fromkeys(tags))
+        logger.info("Deleting %s tags", len(unique_tags))
+        for tag in unique_tags:
+            self._item_groups[tag.item_id].discard(tag.group_name)
+            self._group_items[tag.group_name].discard(tag.item_id)
+        return unique_tags
+
+    async def get_tags_by_item(self, item: Item) -> List[Tag]:
+        return await self.get_tags_by_item_id(item.item_id)
+
+    async def get_tags_by_item_id(self, item_id: int) -> List[Tag]:
+        return [
+            Tag(item_id=item_id, group_name=group_name)
+            for group_name in sorted(self._item_groups.get(item_id, ()))
+        ]
+
+    async def get_tags_by_item_ids(
+        self, item_ids: Iterable[int]
+    ) -> Dict[int, List[Tag]]:
+        return {
+            item_id: await self.get_tags_by_item_id(item_id)
+            for item_id in dict.fromkeys(item_ids)
+        }
+
+    async def get_tags_by_group_name(self, tag_name: str) -> List[Tag]:
+        return [
+            Tag(item_id=item_id, group_name=tag_name)
+            for item_id in sorted(self._group_items.get(tag_name, ()))
+        ]
+
+    async def add_tag_group(self, tag_group: TagGroup) -> TagGroup:
+        logger.info("Creating tag group %s", tag_group)
+        self._tag_groups[tag_group.group_name] = tag_group
+        return tag_group
+
+    async def get_tag_group(self, group_name: str) -> Optional[TagGroup]:
+        return self._tag_groups.get(group_name)
+
+    async def all_tag_groups(self) -> List[TagGroup]:
+        return [self._tag_groups[name] for name in sorted(self._tag_groups)]
+
+    async def delete_tag_group(self, group: TagGroup, delete_tags: bool = True) -> int:
+        logger.info("Deleting %s", group)
+        self._tag_groups.pop(group.group_name, None)
+        if not delete_tags:
+            return 0
+
+        item_ids = self._group_items.pop(group.group_name, set())
+        for item_id in item_ids:
+            self._item_groups[item_id].discard(group.group_name)
+        return len(item_ids)
@@ -0,0 +1,107 @@
+from bisect import bisect_left
+from collections import defaultdict
+from typing import Dict, Iterable, List, Sequence, Set, Tuple
+
+#: Length of the longest n-grams held in the index. Keywords up to this length
+#: are answered directly from a posting list, longer ones by intersecting the
+#: posting lists of their n-grams.
+MAX_GRAM_LENGTH = 3
+
+#: Relevance of a name that matches a keyword exactly
+EXACT_MATCH = 0
+
+#: Relevance of a name that starts with a keyword
+PREFIX_MATCH = 1
+
+#: Relevance of a name that contains a keyword
+SUBSTRING_MATCH = 2
+
+
+class NameIndex:
+    """
+    Case-insensitive n-gram index over item names, supporting substring and
+    prefix search.
+
+    Entries are identified by their position in the sequence the index was
+    built from, and search results are returned as sorted positions. Each entry
+    can have several names (e.g. an ingame name and a wiki name), and matches
+    if any of them do.
+    """
+
+    def __init__(self, entries: Iterable[Sequence[str]]):
+        self._entries: List[Tuple[str, ...]] = [
+            tuple(name.lower() for name in names) for names in entries
+        ]
+
+        grams: Dict[str, Set[int]] = defaultdict(set)
+        for position, names in enumerate(self._entries):
+            for name in names:
+                for length in range(1, MAX_GRAM_LENGTH + 1):
+                    for start in range(len(name) - length + 1):
+                        grams[name[start : start + length]].add(position)
+
+        self._postings: Dict[str, Tuple[int, ...]] = {
+            gram: tuple(sorted(positions)) for gram, positions in grams.items()
+        }
+
+        sorted_names = sorted(
+            (name, position)
+            for position, names in enumerate(self._entries)
+            for name in names
+        )
+        self._sorted_names: List[str] = [name for name, _ in sorted_names]
+        self._sorted_positions: List[int] = [position for _, position in sorted_names]
+
+    def search(self, keyword: str) -> List[int]:
+        """
+        Get the positions of entries with a name containing the keyword
+        """
+        keyword = keyword.lower()
+        if len(keyword) <= MAX_GRAM_LENGTH:
+            return list(self._postings.get(keyword, ()))
+
+        postings = sorted(
+            (
+                self._postings.get(keyword[start : start + MAX_GRAM_LENGTH], ())
+                for start in range(len(keyword) - MAX_GRAM_LENGTH + 1)
+            ),
+            key=len,
+        )
+        candidates = set(postings[0])
+        for posting in postings[1:]:
+            if not candidates:
+                break
+            candidates.intersection_update(posting)
+
+        return sorted(
+            position
+            for position in candidates
+            if any(keyword in name for name in self._entries[position])
+        )
+
+    def search_prefix(self, keyword: str) -> List[int]:
+        """
+        Get the positions of entries with a name starting with the keyword
+        """
+        keyword = keyword.lower()
+        positions = set()
+        for i in range(
+            bisect_left(self._sorted_names, keyword), len(self._sorted_names)
+        ):
+            if not self._sorted_names[i].startswith(keyword):
+                break
+            positions.add(self._sorted_positions[i])
+        return sorted(positions)
+
+    def relevance(self, keyword: str, position: int) -> int:
+        """
+        How well an entry matches a keyword, lower being a better match. One of
+        EXACT_MATCH, PREFIX_MATCH or SUBSTRING_MATCH.
+        """
+        keyword = keyword.lower()
+        names = self._entries[position]
+        if keyword in names:
+            return EXACT_MATCH
+        if any(name.startswith(keyword) for name in names):
+            return PREFIX_MATCH
+        return SUBSTRING_MATCH
@@ -0,0 +1,172 @@
+import base64
+import mmap
+import struct
+from pathlib import Path
+from typing import Generator, Iterable, List, Tuple, Union
+
+from osrs_items_api.catalog import ItemCatalog, ItemRecord
+from osrs_items_api.icon_store import IconStore
+
+#: Identifies a catalog snapshot
+MAGIC = b"OSRSCTLG"
+
+#: Snapshot format version
+VERSION = 2
+
+#: Snapshot header: magic, version, number of records, offset and length of the
+#: string table, offset and length of the embedded icon store, and the version
+#: of the item database it was built from (UTF-8, padded with nulls). Records
+#: follow immediately after the header.
+_HEADER = struct.Struct("<8sIIIIII32s")
+
+#: Item record: item ID, linked item ID (0 if none), offset and length of the name
+#: in the string table, offset and length of the wiki name (length 0 if none),
+#: members flag
+_RECORD = struct.Struct("<IIIHIHB")
+
+
+class CatalogSnapshot:
+    """
+    Compiled, read-only form of the item database: fixed-width item records, a
+    string table of names and an icon store, in a single blob.
+
+    Snapshots are memory-mapped, so loading one doesn't parse anything up front
+    and only the pages that are actually read are ever loaded.
+    """
+
+    def __init__(self, buffer: Union[bytes, mmap.mmap]):
+        (
+            magic,
+            version,
+            self._record_count,
+            self._strings_offset,
+            self._strings_length,
+            self._icons_offset,
+            self._icons_length,
+            source_version,
+        ) = _HEADER.unpack_from(buffer, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError("Not a catalog snapshot, or an unsupported version of one")
+
+        #: Version of the item database the snapshot was built from
+        self.source_version: str = source_version.rstrip(b"\0").decode()
+
+        self._buffer = memoryview(buffer)
+
+    @classmethod
+    def open(cls, path: Union[str, Path]) -> "CatalogSnapshot":
+        """
+        Memory-map a catalog snapshot file
+        """
+        with open(path, "rb") as f:
+            return cls(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+
+    @staticmethod
+    def build(
+        records: Iterable[ItemRecord],
+        icons: Iterable[Tuple[int, bytes]],
+        source_version: str,
+    ) -> bytes:
+        """
+        Build a catalog snapshot from item records and (item ID, PNG bytes) icons,
+        taken from the given version of the item database
+        """
+        packed_records: List[bytes] = []
+        strings = bytearray()
+
+        def add_string(value: str) -> Tuple[int, int]:
+            encoded = value.encode()
+            offset = len(strings)
+            strings.extend(encoded)
+            return offset, len(encoded)
+
+        for record in sorted(records):
+            name_offset, name_length = add_string(record.name)
+            wiki_offset, wiki_length = add_string(record.wiki_name or "")
+            packed_records.append(
+                _RECORD.pack(
+                    record.item_id,
+                    record.linked_id_item or 0,
+                    name_offset,
+                    name_length,
+                    wiki_offset,
+                    wiki_length,
+                    record.members,
+                )
+            )
+
+        icon_store = IconStore.build(icons)
+        strings_offset = _HEADER.size + _RECORD.size * len(packed_records)
+        icons_offset = strings_offset + len(strings)
+
+        return b"".join(
+            [
+                _HEADER.pack(
+                    MAGIC,
+                    VERSION,
+                    len(packed_records),
+                    strings_offset,
+                    len(strings),
+                    icons_offset,
+                    len(icon_store),
+                    source_version.encode(),
+                ),
+                *packed_records,
+                strings,
+                icon_store,
+            ]
+        )
+
+    def __len__(self) -> int:
+        return self._record_count
+
+    def records(self) -> Generator[ItemRecord, None, None]:
+        """
+        Read the item records in the snapshot, in order of ID
+        """
+        records_end = _HEADER.size + _RECORD.size * self._record_count
+        strings = self._buffer[
+            self._strings_offset : self._strings_offset + self._strings_length
+        ]
+
+        for (
+            item_id,
+            linked_id_item,
+            name_offset,
+            name_length,
+            wiki_offset,
+            wiki_length,
+            members,
+        ) in _RECORD.iter_unpack(self._buffer[_HEADER.size : records_end]):
+            yield ItemRecord(
+                item_id=item_id,
+                name=str(strings[name_offset : name_offset + name_length], "utf-8"),
+                members=bool(members),
+                linked_id_item=linked_id_item or None,
+                wiki_name=(
+                    str(strings[wiki_offset : wiki_offset + wiki_length], "utf-8")
+                    if wiki_length
+                    else None
+                ),
+            )
+
+    @property
+    def icons(self) -> IconStore:
+        """
+        The icon store embedded in the snapshot
+        """
+        return IconStore(
+            self._buffer[self._icons_offset : self._icons_offset + self._icons_length]
+        )
+
+    def catalog(self) -> ItemCatalog:
+        """
+        Build a catalog over the items in the snapshot
+        """
+        icons = self.icons
+        return ItemCatalog(
+            self.records(),
+            load_icon=lambda item_id: base64.b64encode(
+                icons.get(item_id) or b""
+            ).decode(),
+        )
@@ -0,0 +1,165 @@
+import json
+import sqlite3
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Union
+
+from osrs_items_api.logging import get_logger
+from osrs_items_api.types import Item, Tag, TagGroup
+
+logger = get_logger()
+
+#: Tables and indexes, created if they don't exist. Tags are clustered by item in
+#: a WITHOUT ROWID table, and indexed by group, so that lookups either way are
+#: answered from a single covering b-tree.
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS tags (
+    item_id INTEGER NOT NULL,
+    group_name TEXT NOT NULL,
+    PRIMARY KEY (item_id, group_name)
+) WITHOUT ROWID;
+
+CREATE INDEX IF NOT EXISTS tags_by_group ON tags (group_name, item_id);
+
+CREATE TABLE IF NOT EXISTS tag_groups (
+    group_name TEXT NOT NULL PRIMARY KEY,
+    description TEXT,
+    item_icon_id INTEGER
+) WITHOUT ROWID;
+"""
+
+#: Statements, which sqlite3 prepares once per connection and then reuses
+_INSERT_TAG = "INSERT OR IGNORE INTO tags (item_id, group_name) VALUES (?, ?)"
+_DELETE_TAG = "DELETE FROM tags WHERE item_id = ? AND group_name = ?"
+_SELECT_ITEM_TAGS = "SELECT group_name FROM tags WHERE item_id = ? ORDER BY group_name"
+_SELECT_ITEMS_TAGS = """
+SELECT item_id, group_name FROM tags
+WHERE item_id IN (SELECT value FROM json_each(?))
+ORDER BY item_id, group_name
+"""
+_SELECT_GROUP_TAGS = "SELECT item_id FROM tags WHERE group_name = ? ORDER BY item_id"
+_DELETE_GROUP_TAGS = "DELETE FROM tags WHERE group_name = ?"
+_INSERT_GROUP_IF_MISSING = "INSERT OR IGNORE INTO tag_groups (group_name) VALUES (?)"
+_PUT_GROUP = """
+INSERT OR REPLACE INTO tag_groups (group_name, description, item_icon_id)
+VALUES (?, ?, ?)
+"""
+_SELECT_GROUP = """
+SELECT group_name, description, item_icon_id FROM tag_groups WHERE group_name = ?
+"""
+_SELECT_GROUPS = """
+SELECT group_name, description, item_icon_id FROM tag_groups ORDER BY group_name
+"""
+_DELETE_GROUP = "DELETE FROM tag_groups WHERE group_name = ?"
+
+#: Milliseconds to wait for another process's write to finish before failing
+BUSY_TIMEOUT = 5000
+
+
+class SQLiteTagStore:
+    """
+    Keeps item tags and tag groups in an embedded SQLite database, for
+    single-node deployments that don't need DynamoDB.
+
+    The database is opened in WAL mode, so reads don't wait for writes, even
+    from other processes. Queries are local and take well under a millisecond,
+    so they run directly on the event loop rather than in a thread.
+    """
+
+    def __init__(self, path: Union[str, Path] = ":memory:"):
+        # Only used from the event loop's thread, though not necessarily the one
+        # it was opened in
+        self._db = sqlite3.connect(str(path), check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode = WAL")
+        self._db.execute("PRAGMA synchronous = NORMAL")
+        self._db.execute(f"PRAGMA busy_timeout = {BUSY_TIMEOUT}")
+        self._db.executescript(_SCHEMA)
+
+    def close(self):
+        self._db.close()
+
+    async def add_tag(self, tag: Tag) -> Tag:
+        await self.add_tags([tag])
+        return tag
+
+    async def add_tags(self, tags: Iterable[Tag]) -> List[Tag]:
+        unique_tags = list(dict.fromkeys(tags))
+        logger.info("Creating %s tags", len(unique_tags))
+        with self._db:
+            self._db.executemany(
+                _INSERT_TAG, ((tag.item_id, tag.group_name) for tag in unique_tags)
+            )
+            self._db.executemany(
+                _INSERT_GROUP_IF_MISSING,
+                ((group_name,) for group_name in {t.group_name for t in unique_tags}),
+            )
+        return unique_tags
+
+    async def delete_tag(self, tag: Tag) -> Tag:
+        await self.delete_tags([tag])
+        return tag
+
+    async def delete_tags(self, tags: Iterable[Tag]) -> List[Tag]:
+        unique_tags = list(dict.fromkeys(tags))
+        logger.info("Deleting %s tags", len(unique_tags))
+        with self._db:
+            self._db.executemany(
+                _DELETE_TAG, ((tag.item_id, tag.group_name) for tag in unique_tags)
+            )
+        return unique_tags
+
+    async def get_tags_by_item(self, item: Item) -> List[Tag]:
+        return await self.get_tags_by_item_id(item.item_id)
+
+    async def get_tags_by_item_id(self, item_id: int) -> List[Tag]:
+        return [
+            Tag(item_id=item_id, group_name=group_name)
+            for group_name, in self._db.execute(_SELECT_ITEM_TAGS, (item_id,))
+        ]
+
+    async def get_tags_by_item_ids(
+        self, item_ids: Iterable[int]
+    ) -> Dict[int, List[Tag]]:
+        items_tags: Dict[int, List[Tag]] = {
+            item_id: [] for item_id in dict.fromkeys(item_ids)
+        }
+        rows = self._db.execute(_SELECT_ITEMS_TAGS, (json.dumps(list(items_tags)),))
+        for item_id, group_name in rows:
+            items_tags[item_id].append(Tag(item_id=item_id, group_name=group_name))
+        return items_tags
+
+    async def get_tags_by_group_name(self, tag_name: str) -> List[Tag]:
+        return [
+            Tag(item_id=item_id, group_name=tag_name)
+            for item_id, in self._db.execute(_SELECT_GROUP_TAGS, (tag_name,))
+        ]
+
+    async def add_tag_group(self, tag_group: TagGroup) -> TagGroup:
+        logger.info("Creating tag group %s", tag_group)
+        with self._db:
+            self._db.execute(
+                _PUT_GROUP,
+                (tag_group.group_name, tag_group.description, tag_group.item_icon_id),
+            )
+        return tag_group
+
+    async def get_tag_group(self, group_name: str) -> Optional[TagGroup]:
+        row = self._db.execute(_SELECT_GROUP, (group_name,)).fetchone()
+        return None if row is None else _tag_group(row)
+
+    async def all_tag_groups(self) -> List[TagGroup]:
+        return [_tag_group(row) for row in self._db.execute(_SELECT_GROUPS)]
+
+    async def delete_tag_group(self, group: TagGroup, delete_tags: bool = True) -> int:
+        logger.info("Deleting %s", group)
+        with self._db:
+            self._db.execute(_DELETE_GROUP, (group.group_name,))
+            if not delete_tags:
+                return 0
+            return self._db.execute(_DELETE_GROUP_TAGS, (group.group_name,)).rowcount
+
+
+def _tag_group(row: tuple) -> TagGroup:
+    group_name, description, item_icon_id = row
+    return TagGroup(
+        group_name=group_name, description=description, item_icon_id=item_icon_id
+    )
@@ -0,0 +1,77 @@
+from typing import Dict, Iterable, List, Optional, Protocol
+
+from osrs_items_api.types import Item, Tag, TagGroup
+
+
+class TagStore(Protocol):
+    """
+    Storage of item tags and tag groups, which the API can be built over.
+
+    Implemented by ``TagsService`` (DynamoDB), ``SQLiteTagStore`` and
+    ``MemoryTagStore``. All writes are idempotent, and tagging items with a
+    group that doesn't exist yet also creates the group.
+    """
+
+    async def add_tag(self, tag: Tag) -> Tag:
+        """
+        Add a tag to an item, creating its tag group if it doesn't exist
+        """
+
+    async def add_tags(self, tags: Iterable[Tag]) -> List[Tag]:
+        """
+        Add several tags, creating any of their tag groups that don't exist, and
+        return them without duplicates
+        """
+
+    async def delete_tag(self, tag: Tag) -> Tag:
+        """
+        Remove a tag from an item
+        """
+
+    async def delete_tags(self, tags: Iterable[Tag]) -> List[Tag]:
+        """
+        Remove several tags, and return them without duplicates
+        """
+
+    async def get_tags_by_item(self, item: Item) -> List[Tag]:
+        """
+        Get all tags of a given item
+        """
+
+    async def get_tags_by_item_id(self, item_id: int) -> List[Tag]:
+        """
+        Get all tags of an item by ID
+        """
+
+    async def get_tags_by_item_ids(
+        self, item_ids: Iterable[int]
+    ) -> Dict[int, List[Tag]]:
+        """
+        Get all tags of several items by ID, by item ID in the order given
+        """
+
+    async def get_tags_by_group_name(self, tag_name: str) -> List[Tag]:
+        """
+        Get all tags with a given name
+        """
+
+    async def add_tag_group(self, tag_group: TagGroup) -> TagGroup:
+        """
+        Add a new tag group, overwriting any existing group info
+        """
+
+    async def get_tag_group(self, group_name: str) -> Optional[TagGroup]:
+        """
+        Get a tag group if it exists
+        """
+
+    async def all_tag_groups(self) -> List[TagGroup]:
+        """
+        Get all tag groups
+        """
+
+    async def delete_tag_group(self, group: TagGroup, delete_tags: bool = True) -> int:
+        """
+        Delete a tag group and optionally all tags with that group name,
+        returning the number of tags deleted
+        """
@@ -1,10 +1,27 @@
-from typing import List, Optional
+import asyncio
+import random
+import time
+from typing import (
+    Any,
+    AsyncGenerator,
+    Awaitable,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+)
+from weakref import WeakKeyDictionary
 
-from boto3.dynamodb.conditions import Key
+from boto3.dynamodb.conditions import Attr, Key
+from botocore.exceptions import ClientError
 
 from osrs_items_api.constants import (
     BANK_TAGS_INDEX_NAME,
+    SCAN_SEGMENTS,
+    TAG_GROUPS_CACHE_TTL,
     TAG_GROUPS_TABLE_NAME,
+    TAG_GROUPS_VERSION_KEY,
     TAGS_TABLE_NAME,
 )
 from osrs_items_api.dynamodb import dynamodb
@@ -13,33 +30,337 @@ from osrs_items_api.types import Item, Tag, TagGroup
 
 logger = get_logger()
 
+#: Most write requests DynamoDB accepts in a single BatchWriteItem call
+BATCH_WRITE_SIZE = 25
+
+#: Times to try writing a batch before giving up on its unprocessed items
+BATCH_WRITE_ATTEMPTS = 8
+
+#: Base and maximum backoff in seconds between retries of unprocessed items
+BATCH_WRITE_BACKOFF = 0.05
+BATCH_WRITE_MAX_BACKOFF = 2.0
+
+#: Number of batches of tags deleted concurrently when deleting a tag group
+DELETE_CONCURRENCY = 4
+
+#: Number of items whose tags are queried concurrently when getting the tags of
+#: several items
+ITEM_QUERY_CONCURRENCY = 8
+
+#: Pages read ahead by each segment of a parallel scan, while waiting to be consumed
+SCAN_BUFFER_PAGES = 2
+
+#: Seconds a tag group is remembered to exist for, without checking DynamoDB again
+KNOWN_TAG_GROUP_TTL = 300.0
+
+
+class UnprocessedWritesError(Exception):
+    """
+    Raised when a batch write still has unprocessed items after retrying
+    """
+
+
+class KnownTagGroups:
+    """
+    Names of tag groups known to exist, so that tagging items with them needn't
+    touch the tag groups table.
+
+    Names are forgotten after a TTL, so a group deleted by another process is
+    recreated when it's next used after at most that long.
+    """
+
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self._expiry: Dict[str, float] = {}
+
+    def __contains__(self, group_name: str) -> bool:
+        expiry = self._expiry.get(group_name)
+        return expiry is not None and expiry > time.monotonic()
+
+    def add(self, group_name: str):
+        self._expiry[group_name] = time.monotonic() + self.ttl
+
+    def discard(self, group_name: str):
+        self._expiry.pop(group_name, None)
+
+    def clear(self):
+        self._expiry.clear()
+
+
+#: Tag groups known to exist, shared by all services in the process
+known_tag_groups = KnownTagGroups(KNOWN_TAG_GROUP_TTL)
+
+
+class TagGroupsSnapshot:
+    """
+    In-process copy of all tag groups, with the version of the tag groups table
+    it was read at.
+
+    Within the TTL the snapshot is used as is. After that, it's only read again
+    if the table's version shows another writer has changed the groups. Writes
+    in this process update the snapshot straight away.
+    """
+
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self.version: Optional[int] = None
+        self._groups: Optional[Dict[str, TagGroup]] = None
+        self._checked_at = 0.0
+
+    @property
+    def groups(self) -> Optional[List[TagGroup]]:
+        """
+        The tag groups, or None if they haven't been read yet
+        """
+        return None if self._groups is None else list(self._groups.values())
+
+    def is_fresh(self) -> bool:
+        return (
+            self._groups is not None and time.monotonic() - self._checked_at < self.ttl
+        )
+
+    def load(self, groups: Iterable[TagGroup], version: int):
+        self._groups = {group.group_name: group for group in groups}
+        self.version = version
+        self.confirm()
+
+    def confirm(self):
+        """
+        Mark the snapshot as up to date
+        """
+        self._checked_at = time.monotonic()
+
+    def put(self, group: TagGroup, version: int):
+        if self._groups is not None:
+            self._groups[group.group_name] = group
+            self._advance(version)
+
+    def remove(self, group_name: str, version: int):
+        if self._groups is not None:
+            self._groups.pop(group_name, None)
+            self._advance(version)
+
+    def clear(self):
+        self._groups = None
+        self.version = None
+
+    def _advance(self, version: int):
+        # Unless this is the only write since the snapshot was read, there have
+        # been other writers, so keep the old version to be read again next time
+        if self.version == version - 1:
+            self.version = version
+
+
+#: Snapshot of all tag groups, shared by all services in the process
+tag_groups_snapshot = TagGroupsSnapshot(TAG_GROUPS_CACHE_TTL)
+
+#: Services over the shared DynamoDB resource, by the event loop it was opened in
+_shared_services: "WeakKeyDictionary[asyncio.AbstractEventLoop, TagsService]" = (
+    WeakKeyDictionary()
+)
+
+
+async def _paginate(
+    operation: Callable[..., Awaitable[Dict[str, Any]]],
+    limit: Optional[int] = None,
+    page_size: Optional[int] = None,
+    **kwargs,
+) -> AsyncGenerator[List[Dict[str, Any]], None]:
+    """
+    Lazily yield pages of items from a DynamoDB query or scan, following
+    LastEvaluatedKey. The next page is fetched in the background while the
+    current one is being consumed, and no more pages are fetched once ``limit``
+    items have been yielded.
+    """
+    remaining = limit
+
+    async def fetch(exclusive_start_key: Optional[Dict[str, Any]] = None):
+        page_kwargs = dict(kwargs)
+        if exclusive_start_key is not None:
+            page_kwargs["ExclusiveStartKey"] = exclusive_start_key
+        page_limit = min(filter(None, [remaining, page_size]), default=None)
+        if page_limit is not None:
+            page_kwargs["Limit"] = page_limit
+        return await operation(**page_kwargs)
+
+    next_page: Optional[asyncio.Future] = asyncio.ensure_future(fetch())
+    try:
+        while next_page is not None:
+            response = await next_page
+            items = response.get("Items", [])
+            if remaining is not None:
+                items = items[:remaining]
+                remaining -= len(items)
+
+            last_key = response.get("LastEvaluatedKey")
+            if last_key is not None and (remaining is None or remaining > 0):
+                next_page = asyncio.ensure_future(fetch(last_key))
+            else:
+                next_page = None
+
+            if items:
+                yield items
+    finally:
+        if next_page is not None:
+            next_page.cancel()
+
+
+#: Marks the end of a segment of a parallel scan
+_SEGMENT_DONE = object()
+
+
+async def _parallel_scan(
+    scan: Callable[..., Awaitable[Dict[str, Any]]],
+    segments: int,
+    ordered: bool = False,
+    page_size: Optional[int] = None,
+    **kwargs,
+) -> AsyncGenerator[List[Dict[str, Any]], None]:
+    """
+    Lazily yield pages of items from a whole-table scan split into segments,
+    which are read concurrently.
+
+    Pages are yielded as they arrive, or if ``ordered``, segment by segment (so
+    in the same order for the same table contents) while later segments are
+    read ahead.
+    """
+    queues: List[asyncio.Queue] = [
+        asyncio.Queue(maxsize=SCAN_BUFFER_PAGES * (1 if ordered else segments))
+        for _ in range(segments if ordered else 1)
+    ]
+
+    async def scan_segment(segment: int, queue: asyncio.Queue):
+        outcome: Any = _SEGMENT_DONE
+        try:
+            async for page in _paginate(
+                scan,
+                page_size=page_size,
+                Segment=segment,
+                TotalSegments=segments,
+                **kwargs,
+            ):
+                await queue.put(page)
+        except Exception as e:
+            outcome = e
+        await queue.put(outcome)
+
+    tasks = [
+        asyncio.ensure_future(scan_segment(segment, queues[segment % len(queues)]))
+        for segment in range(segments)
+    ]
+    try:
+        for queue in queues:
+            remaining = 1 if ordered else segments
+            while remaining:
+                page = await queue.get()
+                if page is _SEGMENT_DONE:
+                    remaining -= 1
+                elif isinstance(page, Exception):
+                    raise page
+                else:
+                    yield page
+    finally:
+        for task in tasks:
+            task.cancel()
+
 
-# TODO: async service
 class TagsService:
-    def __init__(self):
-        self.db = dynamodb()
-        self.tags_table = self.db.Table(TAGS_TABLE_NAME)
-        self.tag_groups_table = self.db.Table(TAG_GROUPS_TABLE_NAME)
+    """
+    Reads and writes item tags and tag groups in DynamoDB, through a DynamoDB
+    resource it's given. Use ``connect`` to create one over the shared resource.
+    """
+
+    def __init__(self, db: Any, tags_table: Any, tag_groups_table: Any):
+        self.db = db
+        self.tags_table = tags_table
+        self.tag_groups_table = tag_groups_table
+
+    @classmethod
+    async def connect(cls, db: Optional[Any] = None) -> "TagsService":
+        """
+        Create a service using a DynamoDB resource, by default the one shared by
+        the whole process
+        """
+        if db is None:
+            db = await dynamodb()
+        return cls(
+            db,
+            tags_table=await db.Table(TAGS_TABLE_NAME),
+            tag_groups_table=await db.Table(TAG_GROUPS_TABLE_NAME),
+        )
+
+    @classmethod
+    async def shared(cls) -> "TagsService":
+        """
+        Get a service over the shared DynamoDB resource, creating it once per
+        resource rather than for every request
+        """
+        db = await dynamodb()
+        loop = asyncio.get_running_loop()
+        service = _shared_services.get(loop)
+        if service is None or service.db is not db:
+            service = _shared_services[loop] = await cls.connect(db)
+        return service
 
-    def add_tag(self, tag: Tag) -> Tag:
+    async def add_tag(self, tag: Tag) -> Tag:
         """
         Idempotently add a new tag to an item, also creating a tag group if it doesn't
         already exist.
         """
         logger.info("Creating %s", tag)
-        self.tags_table.put_item(Item=tag.dict())
+        await asyncio.gather(
+            self.tags_table.put_item(Item=tag.dict()),
+            self._ensure_tag_groups([tag.group_name]),
+        )
+        return tag
 
-        if not self.get_tag_group(tag.group_name):
-            logger.info("Also creating a new tag group for %s", tag.group_name)
-            self.add_tag_group(TagGroup(group_name=tag.group_name))
+    async def add_tags(self, tags: Iterable[Tag]) -> List[Tag]:
+        """
+        Idempotently add several tags in batches, also creating any of their tag
+        groups that don't already exist.
+        """
+        unique_tags = list(dict.fromkeys(tags))
+        logger.info("Creating %s tags", len(unique_tags))
+        await asyncio.gather(
+            self._batch_write(
+                TAGS_TABLE_NAME,
+                [{"PutRequest": {"Item": tag.dict()}} for tag in unique_tags],
+            ),
+            self._ensure_tag_groups(tag.group_name for tag in unique_tags),
+        )
+        return unique_tags
 
-        return tag
+    async def _ensure_tag_groups(self, group_names: Iterable[str]):
+        """
+        Create any of the given tag groups that don't already exist, each with a
+        single conditional write, skipping groups already known to exist
+        """
+        unknown_names = [
+            group_name
+            for group_name in dict.fromkeys(group_names)
+            if group_name not in known_tag_groups
+        ]
+        await asyncio.gather(*map(self._create_tag_group_if_missing, unknown_names))
+
+    async def _create_tag_group_if_missing(self, group_name: str):
+        try:
+            group = TagGroup(group_name=group_name)
+            await self.tag_groups_table.put_item(
+                Item=group.dict(),
+                ConditionExpression=Attr("group_name").not_exists(),
+            )
+            logger.info("Also created a new tag group for %s", group_name)
+            tag_groups_snapshot.put(group, await self._bump_tag_groups_version())
+        except ClientError as e:
+            if e.response["Error"]["Code"] != "ConditionalCheckFailedException":
+                raise
+        known_tag_groups.add(group_name)
 
-    def get_tag(self, tag: Tag, consistent_read=False) -> Optional[Tag]:
+    async def get_tag(self, tag: Tag, consistent_read=False) -> Optional[Tag]:
         """
         Get a tag if it exists, or None if it doesn't exist
         """
-        response = self.tags_table.get_item(
+        response = await self.tags_table.get_item(
             Key=dict(
                 item_id=tag.item_id,
                 group_name=tag.group_name,
@@ -52,12 +373,12 @@ class TagsService:
 
         return Tag.from_dynamodb_item(response["Item"])
 
-    def delete_tag(self, tag: Tag) -> Tag:
+    async def delete_tag(self, tag: Tag) -> Tag:
         """
         Idempotently remove a tag from an item
         """
         logger.info("Deleting %s", tag)
-        self.tags_table.delete_item(
+        await self.tags_table.delete_item(
             Key=dict(
                 item_id=tag.item_id,
                 group_name=tag.group_name,
@@ -65,51 +386,135 @@ class TagsService:
         )
         return tag
 
-    def get_tags_by_item(self, item: Item) -> List[Tag]:
+    async def delete_tags(self, tags: Iterable[Tag]) -> List[Tag]:
+        """
+        Idempotently remove several tags in batches
+        """
+        unique_tags = list(dict.fromkeys(tags))
+        logger.info("Deleting %s tags", len(unique_tags))
+        await self._batch_write(TAGS_TABLE_NAME, _delete_requests(unique_tags))
+        return unique_tags
+
+    async def _batch_write(self, table_name: str, requests: List[Dict[str, Any]]):
+        """
+        Write to a table with BatchWriteItem, in batches of the largest size
+        allowed, retrying unprocessed items with jittered exponential backoff.
+        """
+        for start in range(0, len(requests), BATCH_WRITE_SIZE):
+            unprocessed = {table_name: requests[start : start + BATCH_WRITE_SIZE]}
+            for attempt in range(BATCH_WRITE_ATTEMPTS):
+                if attempt > 0:
+                    backoff = BATCH_WRITE_BACKOFF * 2 ** (attempt - 1)
+                    await asyncio.sleep(
+                        random.uniform(0, min(backoff, BATCH_WRITE_MAX_BACKOFF))
+                    )
+
+                response = await self.db.batch_write_item(RequestItems=unprocessed)
+                unprocessed = response.get("UnprocessedItems") or {}
+                if not unprocessed:
+                    break
+
+                logger.info(
+                    "Retrying %s unprocessed writes", len(unprocessed[table_name])
+                )
+            else:
+                raise UnprocessedWritesError(
+                    f"{len(unprocessed[table_name])} writes to {table_name} "
+                    f"were still unprocessed after {BATCH_WRITE_ATTEMPTS} attempts"
+                )
+
+    async def iter_tags_by_item(
+        self,
+        item_id: int,
+        limit: Optional[int] = None,
+        page_size: Optional[int] = None,
+    ) -> AsyncGenerator[List[Tag], None]:
+        """
+        Lazily yield pages of tags of a given item, up to an optional limit
+        """
+        async for page in _paginate(
+            self.tags_table.query,
+            limit=limit,
+            page_size=page_size,
+            KeyConditionExpression=Key("item_id").eq(item_id),
+        ):
+            yield [Tag.from_dynamodb_item(result) for result in page]
+
+    async def get_tags_by_item(self, item: Item) -> List[Tag]:
         """
         Get all tags of a given item
         """
-        # TODO: paginate and lazily yield from pages
-        result = self.tags_table.query(
-            KeyConditionExpression=Key("item_id").eq(item.item_id)
-        )
+        return await self.get_tags_by_item_id(item.item_id)
 
-        if "Items" not in result:
-            return []
+    async def get_tags_by_item_id(self, item_id: int) -> List[Tag]:
+        """
+        Get all tags of an item by ID
+        """
+        return [tag async for page in self.iter_tags_by_item(item_id) for tag in page]
 
-        return [Tag.from_dynamodb_item(result) for result in result["Items"]]
+    async def get_tags_by_item_ids(
+        self, item_ids: Iterable[int], concurrency: int = ITEM_QUERY_CONCURRENCY
+    ) -> Dict[int, List[Tag]]:
+        """
+        Get all tags of several items by ID, by item ID in the order given, with
+        a bounded number of concurrent queries
+        """
+        semaphore = asyncio.Semaphore(concurrency)
 
-    def get_tags_by_group_name(self, tag_name: str) -> List[Tag]:
+        async def get_tags(item_id: int) -> List[Tag]:
+            async with semaphore:
+                return await self.get_tags_by_item_id(item_id)
+
+        unique_ids = list(dict.fromkeys(item_ids))
+        items_tags = await asyncio.gather(*map(get_tags, unique_ids))
+        return dict(zip(unique_ids, items_tags))
+
+    async def iter_tags_by_group_name(
+        self,
+        tag_name: str,
+        limit: Optional[int] = None,
+        page_size: Optional[int] = None,
+    ) -> AsyncGenerator[List[Tag], None]:
         """
-        Get all tags with a given name
+        Lazily yield pages of tags with a given name, up to an optional limit
         """
-        # TODO: paginate and yield from pages
-        result = self.tags_table.query(
+        async for page in _paginate(
+            self.tags_table.query,
+            limit=limit,
+            page_size=page_size,
             IndexName=BANK_TAGS_INDEX_NAME,
             KeyConditionExpression=Key("group_name").eq(tag_name),
-        )
-
-        if "Items" not in result:
-            return []
+        ):
+            yield [Tag.from_dynamodb_item(result) for result in page]
 
-        return [Tag.from_dynamodb_item(result) for result in result["Items"]]
+    async def get_tags_by_group_name(self, tag_name: str) -> List[Tag]:
+        """
+        Get all tags with a given name
+        """
+        return [
+            tag async for page in self.iter_tags_by_group_name(tag_name) for tag in page
+        ]
 
-    def add_tag_group(self, tag_group: TagGroup) -> TagGroup:
+    async def add_tag_group(self, tag_group: TagGroup) -> TagGroup:
         """
         Add a new tag group, overwriting any existing group info.
         """
         logger.info("Creating tag group %s", tag_group)
-        self.tag_groups_table.put_item(Item=tag_group.dict())
+        await self.tag_groups_table.put_item(Item=tag_group.dict())
+        known_tag_groups.add(tag_group.group_name)
+        tag_groups_snapshot.put(tag_group, await self._bump_tag_groups_version())
         return tag_group
 
-    def get_tag_group(
+    async def get_tag_group(
         self, group_name: str, consistent: bool = False
     ) -> Optional[TagGroup]:
         """
         Get a tag group if it exists
         """
         logger.info("Getting tag group %s", group_name)
-        response = self.tag_groups_table.get_item(
+        if group_name == TAG_GROUPS_VERSION_KEY:
+            return None
+        response = await self.tag_groups_table.get_item(
             Key={"group_name": group_name},
             ConsistentRead=consistent,
         )
@@ -119,31 +524,156 @@ class TagsService:
             else None
         )
 
-    def all_tag_groups(self) -> List[TagGroup]:
+    async def iter_tag_groups(
+        self, limit: Optional[int] = None, page_size: Optional[int] = None
+    ) -> AsyncGenerator[List[TagGroup], None]:
+        """
+        Lazily yield pages of tag groups, up to an optional limit
+        """
+        async for page in _paginate(
+            self.tag_groups_table.scan,
+            limit=limit,
+            page_size=page_size,
+            FilterExpression=Attr("group_name").ne(TAG_GROUPS_VERSION_KEY),
+        ):
+            yield [TagGroup.from_dynamodb_item(result) for result in page]
+
+    async def scan_tag_groups(
+        self,
+        segments: int = SCAN_SEGMENTS,
+        ordered: bool = False,
+        page_size: Optional[int] = None,
+        consistent: bool = False,
+    ) -> AsyncGenerator[List[TagGroup], None]:
+        """
+        Lazily yield pages of all tag groups, from a parallel scan of the table,
+        optionally with strongly consistent reads
+        """
+        async for page in _parallel_scan(
+            self.tag_groups_table.scan,
+            segments,
+            ordered=ordered,
+            page_size=page_size,
+            FilterExpression=Attr("group_name").ne(TAG_GROUPS_VERSION_KEY),
+            ConsistentRead=consistent,
+        ):
+            yield [TagGroup.from_dynamodb_item(result) for result in page]
+
+    async def scan_tags(
+        self,
+        segments: int = SCAN_SEGMENTS,
+        ordered: bool = False,
+        page_size: Optional[int] = None,
+    ) -> AsyncGenerator[List[Tag], None]:
+        """
+        Lazily yield pages of every tag of every item, from a parallel scan of the
+        tags table, e.g. for exports or repair jobs
+        """
+        async for page in _parallel_scan(
+            self.tags_table.scan, segments, ordered=ordered, page_size=page_size
+        ):
+            yield [Tag.from_dynamodb_item(result) for result in page]
+
+    async def all_tag_groups(self) -> List[TagGroup]:
         """
-        Get all tag groups
+        Get all tag groups, from the in-process snapshot unless it's expired and
+        the groups have since changed
         """
-        # TODO: paginate and lazily yield results
-        result = self.tag_groups_table.scan()
-        if "Items" not in result:
-            return []
+        snapshot = tag_groups_snapshot
+        if not snapshot.is_fresh():
+            version = await self.tag_groups_version()
+            if snapshot.groups is None or version != snapshot.version:
+                # Consistent, so the snapshot has every write up to its version
+                logger.info("Reading all tag groups at version %s", version)
+                pages = self.scan_tag_groups(consistent=True)
+                snapshot.load(
+                    [group async for page in pages for group in page], version
+                )
+            else:
+                snapshot.confirm()
 
-        return [TagGroup.from_dynamodb_item(result) for result in result["Items"]]
+        return snapshot.groups or []
 
-    def delete_tag_group(self, group: TagGroup, delete_tags=True) -> TagGroup:
+    async def tag_groups_version(self) -> int:
         """
-        Delete a tag group and optionally delete all tags with that group name
+        Get the version of the tag groups table, which goes up with every write
+        to a tag group
+        """
+        response = await self.tag_groups_table.get_item(
+            Key={"group_name": TAG_GROUPS_VERSION_KEY}, ConsistentRead=True
+        )
+        return int(response.get("Item", {}).get("version", 0))
+
+    async def _bump_tag_groups_version(self) -> int:
+        response = await self.tag_groups_table.update_item(
+            Key={"group_name": TAG_GROUPS_VERSION_KEY},
+            UpdateExpression="ADD version :one",
+            ExpressionAttributeValues={":one": 1},
+            ReturnValues="UPDATED_NEW",
+        )
+        return int(response["Attributes"]["version"])
+
+    async def delete_tag_group(self, group: TagGroup, delete_tags=True) -> int:
+        """
+        Delete a tag group and optionally delete all tags with that group name,
+        returning the number of tags deleted.
+
+        Tags are deleted in batches by several concurrent workers as pages of
+        them are read, reading ahead by at most a batch per worker.
         """
         logger.info("Deleting %s", group)
-        self.tag_groups_table.delete_item(
+        known_tag_groups.discard(group.group_name)
+        await self.tag_groups_table.delete_item(
             Key=dict(
                 group_name=group.group_name,
             )
         )
+        tag_groups_snapshot.remove(
+            group.group_name, await self._bump_tag_groups_version()
+        )
+
+        if not delete_tags:
+            return 0
+
+        batches: asyncio.Queue = asyncio.Queue(maxsize=DELETE_CONCURRENCY)
+
+        async def read_batches() -> int:
+            deleted = 0
+            async for page in self.iter_tags_by_group_name(group.group_name):
+                requests = _delete_requests(page)
+                for start in range(0, len(requests), BATCH_WRITE_SIZE):
+                    await batches.put(requests[start : start + BATCH_WRITE_SIZE])
+                deleted += len(page)
+            for _ in range(DELETE_CONCURRENCY):
+                await batches.put(None)
+            return deleted
+
+        async def delete_batches():
+            while True:
+                batch = await batches.get()
+                if batch is None:
+                    return
+                await self._batch_write(TAGS_TABLE_NAME, batch)
+
+        tasks = [
+            asyncio.ensure_future(read_batches()),
+            *(
+                asyncio.ensure_future(delete_batches())
+                for _ in range(DELETE_CONCURRENCY)
+            ),
+        ]
+        try:
+            deleted, *_ = await asyncio.gather(*tasks)
+        finally:
+            for task in tasks:
+                task.cancel()
+
+        logger.info("Deleted %s tags of %s", deleted, group.group_name)
+        return deleted
 
-        if delete_tags:
-            tags = self.get_tags_by_group_name(group.group_name)
-            for tag in tags:
-                self.delete_tag(tag)
 
-        return group
+def _delete_requests(tags: Iterable[Tag]) -> List[Dict[str, Any]]:
+    return [
+        {"DeleteRequest": {"Key": dict(item_id=t.item_id, group_name=t.group_name)}}
+        for t in tags
+    ]
@@ -2,14 +2,22 @@ from typing import Any, Dict, Optional, Type, TypeVar
 
 from fastapi_camelcase import CamelModel
 from osrsbox.items_api.item_properties import ItemProperties
+from pydantic import validator
 from pydantic.main import BaseModel
 
+from osrs_items_api.constants import TAG_GROUPS_VERSION_KEY
 from osrs_items_api.dynamodb import from_dynamodb
 
 _T = TypeVar("_T")
 _P = TypeVar("_P", bound=BaseModel)
 
 
+def _check_group_name(group_name: str) -> str:
+    if group_name == TAG_GROUPS_VERSION_KEY:
+        raise ValueError("Reserved group name")
+    return group_name
+
+
 class DynamoDBModel(CamelModel):
     @classmethod
     def from_dynamodb_item(cls: Type[_P], data: Dict[str, Any]) -> _P:
@@ -60,6 +68,8 @@ class Tag(DynamoDBModel):
     #: Name of the tag group
     group_name: str
 
+    _check_group_name = validator("group_name", allow_reuse=True)(_check_group_name)
+
 
 class TagGroup(DynamoDBModel):
     """
@@ -72,6 +82,8 @@ class TagGroup(DynamoDBModel):
     #: Group name
     group_name: str
 
+    _check_group_name = validator("group_name", allow_reuse=True)(_check_group_name)
+
     #: Description
     description: Optional[str]
 
@@ -1,5 +1,8 @@
+from typing import Generator
+
 import boto3
 import pytest
+import pytest_asyncio
 from fastapi.testclient import TestClient
 
 from osrs_items_api._tablespec import tag_groups_table, tags_table
@@ -9,7 +12,12 @@ from osrs_items_api.constants import (
     TAG_GROUPS_TABLE_NAME,
     TAGS_TABLE_NAME,
 )
-from osrs_items_api.tags_service import TagsService
+from osrs_items_api.dynamodb import close_dynamodb
+from osrs_items_api.tags_service import (
+    TagsService,
+    known_tag_groups,
+    tag_groups_snapshot,
+)
 
 
 @pytest.fixture
@@ -52,6 +60,8 @@ def temporary_tag_groups_table(dynamodb_client):
     not_exists_waiter = dynamodb_client.get_waiter("table_not_exists")
 
     exists_waiter.wait(TableName=TAG_GROUPS_TABLE_NAME)
+    known_tag_groups.clear()
+    tag_groups_snapshot.clear()
 
     try:
         yield table
@@ -60,17 +70,21 @@ def temporary_tag_groups_table(dynamodb_client):
         not_exists_waiter.wait(TableName=TAG_GROUPS_TABLE_NAME)
 
 
-@pytest.fixture
-def tags_service(temporary_tags_table, temporary_tag_groups_table) -> TagsService:
+@pytest_asyncio.fixture
+async def tags_service(temporary_tags_table, temporary_tag_groups_table):
     """
     Return a service that can interact with a temporary games table
     """
-    return TagsService()
+    yield await TagsService.connect()
+    await close_dynamodb()
 
 
 @pytest.fixture
-def api_client(tags_service) -> TestClient:
+def api_client(
+    temporary_tags_table, temporary_tag_groups_table
+) -> Generator[TestClient, None, None]:
     """
     Return an API test client that can interact with a temporary database
     """
-    return TestClient(app)
+    with TestClient(app) as client:
+        yield client
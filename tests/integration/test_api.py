@@ -1,5 +1,13 @@
+import asyncio
+import base64
+from unittest import mock
+
+import pytest
 from fastapi.testclient import TestClient
 
+from osrs_items_api import dynamodb, items_service
+from osrs_items_api.api import MAX_SPRITE_ICONS, handler, precompressed
+from osrs_items_api.constants import TAG_GROUPS_VERSION_KEY
 from osrs_items_api.tags_service import TagsService
 from osrs_items_api.types import Tag, TagGroup
 
@@ -55,23 +63,153 @@ def test_search_items_200_4(api_client: TestClient):
     assert_expected_items_json(result.json(), [])
 
 
-def test_search_items_200_5(tags_service: TagsService, api_client: TestClient):
+@pytest.mark.asyncio
+async def test_search_items_200_5(tags_service: TagsService, api_client: TestClient):
     """
     GET /items OK
     By tags
     """
-    tags_service.add_tag(Tag(item_id=123, group_name="A"))
-    tags_service.add_tag(Tag(item_id=123, group_name="B"))
-    tags_service.add_tag(Tag(item_id=456, group_name="A"))
-    tags_service.add_tag(Tag(item_id=456, group_name="C"))
-    tags_service.add_tag(Tag(item_id=789, group_name="A"))
-    tags_service.add_tag(Tag(item_id=789, group_name="B"))
+    await tags_service.add_tag(Tag(item_id=123, group_name="A"))
+    await tags_service.add_tag(Tag(item_id=123, group_name="B"))
+    await tags_service.add_tag(Tag(item_id=456, group_name="A"))
+    await tags_service.add_tag(Tag(item_id=456, group_name="C"))
+    await tags_service.add_tag(Tag(item_id=789, group_name="A"))
+    await tags_service.add_tag(Tag(item_id=789, group_name="B"))
 
     result = api_client.get("/items?hasTags=A,C")
     assert result.status_code == 200
     assert_expected_items_json(result.json(), [456])
 
 
+@pytest.mark.asyncio
+async def test_search_items_200_10(tags_service: TagsService, api_client: TestClient):
+    """
+    GET /items OK
+    By tags, combined with other filters
+    """
+    await tags_service.add_tag(Tag(item_id=1891, group_name="A"))
+    await tags_service.add_tag(Tag(item_id=1891, group_name="B"))
+    await tags_service.add_tag(Tag(item_id=1305, group_name="A"))
+    await tags_service.add_tag(Tag(item_id=1305, group_name="B"))
+    await tags_service.add_tag(Tag(item_id=1887, group_name="A"))
+
+    result = api_client.get("/items?hasTags=A,B&includeMembers=0")
+    assert result.status_code == 200
+    assert_expected_items_json(result.json(), [1891])
+
+    result = api_client.get("/items?hasTags=B,C")
+    assert result.status_code == 200
+    assert_expected_items_json(result.json(), [])
+
+
+def test_search_items_200_6(api_client: TestClient):
+    """
+    GET /items OK
+    Name starts with
+    """
+    result = api_client.get("/items?nameStartsWith=dragon%20longs")
+    assert result.status_code == 200
+    assert_expected_items_json(result.json(), [1305])
+
+
+def test_search_items_200_7(api_client: TestClient):
+    """
+    GET /items OK
+    Ordered by relevance to the name searched for
+    """
+    result = api_client.get("/items?nameLike=cake&orderBy=relevance&limit=3")
+    assert result.status_code == 200
+    assert [item["itemId"] for item in result.json()["items"]] == [1891, 24549, 1887]
+
+
+def test_search_items_200_8(api_client: TestClient):
+    """
+    GET /items OK
+    Only selected fields
+    """
+    result = api_client.get("/items?itemId=1891&fields=itemId,name")
+    assert result.status_code == 200
+    assert result.json() == {
+        "totalCount": 1,
+        "items": [{"itemId": 1891, "name": "Cake"}],
+    }
+
+
+def test_search_items_200_9(api_client: TestClient):
+    """
+    GET /items OK
+    Pages after an item ID
+    """
+    first_page = api_client.get(
+        f"/items?nameLike={DRAGON_LONGSWORD_SEARCH[:6]}&limit=3"
+    )
+    last_id = first_page.json()["items"][-1]["itemId"]
+    result = api_client.get(
+        f"/items?nameLike={DRAGON_LONGSWORD_SEARCH[:6]}&limit=3&after={last_id}"
+    )
+
+    assert result.status_code == 200
+    assert result.json()["totalCount"] == first_page.json()["totalCount"]
+    assert (
+        result.json()["items"]
+        == api_client.get(
+            f"/items?nameLike={DRAGON_LONGSWORD_SEARCH[:6]}&limit=3&offset=3"
+        ).json()["items"]
+    )
+
+
+def test_search_items_200_11(api_client: TestClient):
+    """
+    GET /items OK
+    Looking up several IDs, in the order given
+    """
+    result = api_client.get("/items?ids=1892,1305,999999,1891,1305")
+
+    assert result.status_code == 200
+    assert result.json()["totalCount"] == 3
+    assert [item["itemId"] for item in result.json()["items"]] == [1892, 1305, 1891]
+    assert_expected_items_json(result.json(), [1892, 1305, 1891])
+    assert result.json()["missingIds"] == [999999]
+
+
+def test_search_items_422(api_client: TestClient):
+    """
+    GET /items Unprocessable
+    Unknown fields
+    """
+    result = api_client.get("/items?itemId=1891&fields=itemId,price")
+    assert result.status_code == 422
+
+
+def test_search_items_422_2(api_client: TestClient):
+    """
+    GET /items Unprocessable
+    IDs to look up aren't numbers
+    """
+    result = api_client.get("/items?ids=1891,cake")
+    assert result.status_code == 422
+
+
+def test_lookup_items_200(api_client: TestClient):
+    """
+    POST /items/batch OK
+    """
+    result = api_client.post(
+        "/items/batch?fields=itemId,name", json={"ids": [1891, 0, 1305, 999999]}
+    )
+
+    assert result.status_code == 200
+    assert result.json() == {
+        "totalCount": 3,
+        "items": [
+            {"itemId": 1891, "name": "Cake"},
+            {"itemId": 0, "name": "Dwarf remains"},
+            {"itemId": 1305, "name": "Dragon longsword"},
+        ],
+        "missingIds": [999999],
+    }
+
+
 def get_item_200(api_client: TestClient):
     """
     GET /item/1891 OK
@@ -90,16 +228,313 @@ def get_item_404(api_client: TestClient):
     assert result.status_code == 404
 
 
-def test_search_groups_200_1(tags_service: TagsService, api_client: TestClient):
+def test_get_related_items_200(api_client: TestClient):
+    """
+    GET /items/related/1891 OK
+    (noted and placeholder forms of cake)
+    """
+    result = api_client.get("/items/related/1891")
+    assert result.status_code == 200
+    assert_expected_items_json({"items": result.json()}, [1892, 19099])
+
+
+def test_get_related_items_200_fields(api_client: TestClient):
+    """
+    GET /items/related/1891 OK
+    Only selected fields
+    """
+    result = api_client.get("/items/related/1891?fields=itemId")
+    assert result.status_code == 200
+    assert result.json() == [{"itemId": 1892}, {"itemId": 19099}]
+
+
+def test_get_icon_200(api_client: TestClient):
+    """
+    GET /icon/1891 OK
+    """
+    result = api_client.get("/icon/1891")
+    assert result.status_code == 200
+    assert result.headers["content-type"] == "image/png"
+    assert result.content == base64.b64decode(items_service.get_item(1891).icon_base64)
+
+
+def test_get_icon_304(api_client: TestClient):
+    """
+    GET /icon/1891 Not Modified
+    The client already has the icon
+    """
+    etag = api_client.get("/icon/1891").headers["etag"]
+    result = api_client.get("/icon/1891", headers={"If-None-Match": etag})
+    assert result.status_code == 304
+
+
+def test_get_item_304(api_client: TestClient):
+    """
+    GET /item/1891 Not Modified
+    The client already has the item
+    """
+    result = api_client.get("/item/1891")
+    assert result.status_code == 200
+    assert result.headers["cache-control"] == "public, max-age=86400"
+    etag = result.headers["etag"]
+    assert not etag.startswith("W/")
+
+    result = api_client.get("/item/1891", headers={"If-None-Match": etag})
+    assert result.status_code == 304
+    assert result.headers["etag"] == etag
+
+    result = api_client.get("/item/1891?fields=name", headers={"If-None-Match": etag})
+    assert result.status_code == 200
+
+
+def test_search_items_304(api_client: TestClient):
+    """
+    GET /items Not Modified
+    The client already has the results of the same search
+    """
+    etag = api_client.get("/items?nameLike=bucket").headers["etag"]
+
+    result = api_client.get("/items?nameLike=bucket", headers={"If-None-Match": etag})
+    assert result.status_code == 304
+
+    result = api_client.get("/items?nameLike=cake", headers={"If-None-Match": etag})
+    assert result.status_code == 200
+
+
+def test_search_items_gzip(api_client: TestClient):
+    """
+    GET /items OK
+    Large results are compressed if the client accepts it, and kept compressed
+    """
+    precompressed.clear()
+
+    result = api_client.get("/items", headers={"Accept-Encoding": "gzip"})
+    assert result.status_code == 200
+    assert result.headers["content-encoding"] == "gzip"
+    assert result.headers["vary"] == "Accept-Encoding"
+    etag = result.headers["etag"]
+    assert etag.endswith('-gzip"')
+    assert precompressed.get(etag, "gzip") is not None
+
+    again = api_client.get("/items", headers={"Accept-Encoding": "gzip"})
+    assert again.headers["content-encoding"] == "gzip"
+    assert again.headers["etag"] == etag
+    assert again.json() == result.json()
+
+    result = api_client.get("/items", headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in result.headers
+    assert result.headers["etag"] != etag
+    assert result.json() == again.json()
+
+
+def test_get_item_uncompressed(api_client: TestClient):
+    """
+    GET /item/1891 OK
+    Small responses aren't compressed
+    """
+    result = api_client.get(
+        "/item/1891?fields=name", headers={"Accept-Encoding": "gzip"}
+    )
+    assert result.status_code == 200
+    assert "content-encoding" not in result.headers
+    assert result.json() == {"name": "Cake"}
+
+
+@pytest.mark.asyncio
+async def test_get_items_by_tag_304(tags_service: TagsService, api_client: TestClient):
+    """
+    GET /items/tag/food Not Modified
+    Responses that depend on tags have weak, short-lived validators, which change
+    with the tags
+    """
+    await tags_service.add_tag(Tag(item_id=1891, group_name="food"))
+
+    result = api_client.get("/items/tag/food")
+    assert result.headers["cache-control"] == "public, max-age=5"
+    etag = result.headers["etag"]
+    assert etag.startswith("W/")
+
+    result = api_client.get("/items/tag/food", headers={"If-None-Match": etag})
+    assert result.status_code == 304
+
+    await tags_service.add_tag(Tag(item_id=1925, group_name="food"))
+    result = api_client.get("/items/tag/food", headers={"If-None-Match": etag})
+    assert result.status_code == 200
+
+
+@pytest.mark.asyncio
+async def test_get_tags_by_items_200(tags_service: TagsService, api_client: TestClient):
+    """
+    GET /tags/items OK
+    """
+    await tags_service.add_tags(
+        [
+            Tag(item_id=1891, group_name="food"),
+            Tag(item_id=1925, group_name="buckets"),
+        ]
+    )
+
+    result = api_client.get("/tags/items?ids=1925,1305,1891")
+    assert result.status_code == 200
+    assert result.json() == {
+        "1925": [{"itemId": 1925, "groupName": "buckets"}],
+        "1305": [],
+        "1891": [{"itemId": 1891, "groupName": "food"}],
+    }
+
+    result = api_client.post("/tags/items", json={"ids": [1891]})
+    assert result.status_code == 200
+    assert result.json() == {"1891": [{"itemId": 1891, "groupName": "food"}]}
+
+
+def test_get_tags_by_items_422(api_client: TestClient):
+    """
+    GET /tags/items Unprocessable
+    No item IDs
+    """
+    result = api_client.get("/tags/items")
+    assert result.status_code == 422
+
+
+@pytest.mark.asyncio
+async def test_get_items_by_tags_200(tags_service: TagsService, api_client: TestClient):
+    """
+    POST /items/tags OK
+    Items of several groups at once, with the info about each group
+    """
+    food = TagGroup(group_name="food", description="Tasty", item_icon_id=1891)
+    await tags_service.add_tag_group(food)
+    await tags_service.add_tags(
+        [
+            Tag(item_id=1891, group_name="food"),
+            Tag(item_id=1925, group_name="food"),
+            Tag(item_id=1925, group_name="buckets"),
+        ]
+    )
+
+    result = api_client.post(
+        "/items/tags?includeGroups=1",
+        json={"groupNames": ["food", "buckets", "empty", "food"]},
+    )
+
+    assert result.status_code == 200
+    items = result.json()["items"]
+    assert list(items) == ["food", "buckets", "empty"]
+    assert_expected_items_json({"items": items["food"]}, [1891, 1925])
+    assert_expected_items_json({"items": items["buckets"]}, [1925])
+    assert items["empty"] == []
+    assert_expected_tag_groups(
+        list(result.json()["groups"].values()),
+        [food, TagGroup(group_name="buckets")],
+    )
+
+
+@pytest.mark.asyncio
+async def test_get_items_by_tags_200_2(
+    tags_service: TagsService, api_client: TestClient
+):
+    """
+    POST /items/tags OK
+    Only some fields of items, including related items, without group info
+    """
+    await tags_service.add_tag(Tag(item_id=1891, group_name="food"))
+
+    result = api_client.post(
+        "/items/tags?includeRelated=1&fields=itemId", json={"groupNames": ["food"]}
+    )
+
+    assert result.status_code == 200
+    assert result.json() == {
+        "items": {"food": [{"itemId": 1891}, {"itemId": 1892}, {"itemId": 19099}]},
+        "groups": None,
+    }
+
+
+def test_get_icon_404(api_client: TestClient):
+    """
+    GET /icon/99999999 Not Found
+    """
+    result = api_client.get("/icon/99999999")
+    assert result.status_code == 404
+
+
+def test_get_icons_sprite_200(api_client: TestClient):
+    """
+    GET /icons/sprite OK
+    """
+    result = api_client.get("/icons/sprite?ids=1891,1925")
+    assert result.status_code == 200
+    assert result.headers["content-type"] == "image/png"
+
+
+def test_get_icons_sprite_422(api_client: TestClient):
+    """
+    GET /icons/sprite Unprocessable
+    Item IDs that aren't numbers, none at all, or too many
+    """
+    too_many = ",".join(["1891"] * (MAX_SPRITE_ICONS + 1))
+    for ids in ("1891,a", "", ",", too_many):
+        result = api_client.get(f"/icons/sprite?ids={ids}")
+        assert result.status_code == 422
+        assert result.json()["detail"][0]["loc"] == ["query", "ids"]
+
+
+@pytest.mark.asyncio
+async def test_post_tags_200(tags_service: TagsService, api_client: TestClient):
+    """
+    POST /tags OK
+    Returns the written tags, including related items
+    """
+    result = api_client.post(
+        "/tags?includeRelated=true",
+        json=[
+            {"itemId": 1891, "groupName": "food"},
+            {"itemId": 1925, "groupName": "food"},
+        ],
+    )
+
+    assert result.status_code == 200
+    written = {Tag.parse_obj(tag) for tag in result.json()}
+    assert written == {
+        Tag(item_id=item_id, group_name="food")
+        for item_id in (1891, 1925)
+        + items_service.catalog.get_related_ids(1891)
+        + items_service.catalog.get_related_ids(1925)
+    }
+    assert set(await tags_service.get_tags_by_group_name("food")) == written
+
+
+@pytest.mark.asyncio
+async def test_delete_tags_200(tags_service: TagsService, api_client: TestClient):
+    """
+    DELETE /tags OK
+    """
+    tags = [Tag(item_id=1891, group_name="food"), Tag(item_id=1925, group_name="food")]
+    await tags_service.add_tags(tags)
+
+    result = api_client.delete(
+        "/tags",
+        json=[
+            {"itemId": 1891, "groupName": "food"},
+            {"itemId": 1925, "groupName": "food"},
+        ],
+    )
+
+    assert result.status_code == 200
+    assert await tags_service.get_tags_by_group_name("food") == []
+
+
+@pytest.mark.asyncio
+async def test_search_groups_200_1(tags_service: TagsService, api_client: TestClient):
     """
     Search by hasItems returns groups that have all the selected items
     """
-    tags_service.add_tag(Tag(item_id=123, group_name="A"))
-    tags_service.add_tag(Tag(item_id=123, group_name="B"))
-    tags_service.add_tag(Tag(item_id=456, group_name="A"))
-    tags_service.add_tag(Tag(item_id=456, group_name="C"))
-    tags_service.add_tag(Tag(item_id=789, group_name="A"))
-    tags_service.add_tag(Tag(item_id=789, group_name="B"))
+    await tags_service.add_tag(Tag(item_id=123, group_name="A"))
+    await tags_service.add_tag(Tag(item_id=123, group_name="B"))
+    await tags_service.add_tag(Tag(item_id=456, group_name="A"))
+    await tags_service.add_tag(Tag(item_id=456, group_name="C"))
+    await tags_service.add_tag(Tag(item_id=789, group_name="A"))
+    await tags_service.add_tag(Tag(item_id=789, group_name="B"))
 
     result = api_client.get("/groups?hasItems=123,456")
 
@@ -110,3 +545,84 @@ def test_search_groups_200_1(tags_service: TagsService, api_client: TestClient):
             TagGroup(group_name="A"),
         ],
     )
+
+
+@pytest.mark.asyncio
+async def test_search_groups_200_2(tags_service: TagsService, api_client: TestClient):
+    """
+    Search by hasItems combined with nameLike, and for items in no groups
+    """
+    await tags_service.add_tags(
+        [
+            Tag(item_id=1891, group_name="Food"),
+            Tag(item_id=1891, group_name="Fish food"),
+            Tag(item_id=1925, group_name="Food"),
+            Tag(item_id=1925, group_name="Fish food"),
+            Tag(item_id=1925, group_name="Buckets"),
+        ]
+    )
+
+    result = api_client.get("/groups?hasItems=1891,1925&nameLike=fish")
+    assert result.status_code == 200
+    assert_expected_tag_groups(result.json(), [TagGroup(group_name="Fish food")])
+
+    result = api_client.get("/groups?hasItems=1891,88")
+    assert result.status_code == 200
+    assert_expected_tag_groups(result.json(), [])
+
+
+def test_search_groups_422(api_client: TestClient):
+    """
+    GET /groups Unprocessable
+    Item IDs that aren't numbers, or none at all
+    """
+    for has_items in ("x", "1891,x", ""):
+        result = api_client.get(f"/groups?hasItems={has_items}")
+        assert result.status_code == 422
+        assert result.json()["detail"][0]["loc"] == ["query", "hasItems"]
+
+
+def test_put_group_422(api_client: TestClient):
+    """
+    PUT /group with the reserved group name fails
+    """
+    result = api_client.put("/group", json={"groupName": TAG_GROUPS_VERSION_KEY})
+    assert result.status_code == 422
+
+
+def test_lambda_handler_reuses_dynamodb(
+    temporary_tags_table, temporary_tag_groups_table
+):
+    """
+    Lambda invocations share one DynamoDB resource, rather than opening and
+    closing it around every request
+    """
+    event = {
+        "resource": "/{proxy+}",
+        "path": "/tags/item/1891",
+        "httpMethod": "GET",
+        "headers": {"host": "api.example.com"},
+        "multiValueHeaders": {},
+        "queryStringParameters": None,
+        "multiValueQueryStringParameters": None,
+        "requestContext": {"identity": {"sourceIp": "127.0.0.1"}},
+        "body": None,
+        "isBase64Encoded": False,
+    }
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    try:
+        with mock.patch.object(
+            dynamodb, "_open_dynamodb", wraps=dynamodb._open_dynamodb
+        ) as open_dynamodb:
+            for _ in range(2):
+                response = handler(event, None)
+                assert response["statusCode"] == 200
+                assert response["body"] == "[]"
+
+        assert open_dynamodb.call_count == 1
+        assert loop in dynamodb._resources
+    finally:
+        loop.run_until_complete(dynamodb.close_dynamodb())
+        asyncio.set_event_loop(None)
+        loop.close()
@@ -1,46 +1,62 @@
+import asyncio
+
+import pytest
+
 from osrs_items_api import items_service
-from osrs_items_api.tags_service import TagsService
-from osrs_items_api.types import Tag
+from osrs_items_api.constants import TAG_GROUPS_VERSION_KEY
+from osrs_items_api.dynamodb import close_dynamodb, dynamodb
+from osrs_items_api.tags_service import (
+    DELETE_CONCURRENCY,
+    TagsService,
+    known_tag_groups,
+    tag_groups_snapshot,
+)
+from osrs_items_api.types import Tag, TagGroup
 
 
-def test_add_and_get_tags(tags_service: TagsService):
+@pytest.mark.asyncio
+async def test_add_and_get_tags(tags_service: TagsService):
     """
     Can add and retrieve tags
     """
     tag = Tag(item_id=1891, group_name="food")
-    tags_service.add_tag(tag)
-    assert tags_service.get_tag(tag) == tag
+    await tags_service.add_tag(tag)
+    assert await tags_service.get_tag(tag) == tag
 
 
-def test_add_tags_idempotent(tags_service: TagsService):
+@pytest.mark.asyncio
+async def test_add_tags_idempotent(tags_service: TagsService):
     """
     Can idempotently add tags
     """
     tag = Tag(item_id=1891, group_name="food")
-    tags_service.add_tag(tag)
-    tags_service.add_tag(tag)
-    assert tags_service.get_tag(tag) == tag
+    await tags_service.add_tag(tag)
+    await tags_service.add_tag(tag)
+    assert await tags_service.get_tag(tag) == tag
 
 
-def test_get_nonexistent_item(tags_service: TagsService):
+@pytest.mark.asyncio
+async def test_get_nonexistent_item(tags_service: TagsService):
     """
     Getting a nonexistent tag returns None
     """
     tag = Tag(item_id=1891, group_name="food")
-    assert tags_service.get_tag(tag) is None
+    assert await tags_service.get_tag(tag) is None
 
 
-def test_delete_tag(tags_service: TagsService):
+@pytest.mark.asyncio
+async def test_delete_tag(tags_service: TagsService):
     """
     Can delete a tag
     """
     tag = Tag(item_id=1891, group_name="food")
-    tags_service.add_tag(tag)
-    tags_service.delete_tag(tag)
-    assert tags_service.get_tag(tag) is None
+    await tags_service.add_tag(tag)
+    await tags_service.delete_tag(tag)
+    assert await tags_service.get_tag(tag) is None
 
 
-def test_get_tags_by_item(tags_service: TagsService):
+@pytest.mark.asyncio
+async def test_get_tags_by_item(tags_service: TagsService):
     """
     Can get all tags of a given item
     """
@@ -52,13 +68,13 @@ def test_get_tags_by_item(tags_service: TagsService):
     pie_dish_cooking_tag = Tag(item_id=2313, group_name="cooking")
     boots_lightness_travel_tag = Tag(item_id=88, group_name="travel")
 
-    tags_service.add_tag(bucket_crafting_tag)
-    tags_service.add_tag(bucket_cooking_tag)
-    tags_service.add_tag(pie_dish_cooking_tag)
-    tags_service.add_tag(bucket_farming_tag)
-    tags_service.add_tag(boots_lightness_travel_tag)
+    await tags_service.add_tag(bucket_crafting_tag)
+    await tags_service.add_tag(bucket_cooking_tag)
+    await tags_service.add_tag(pie_dish_cooking_tag)
+    await tags_service.add_tag(bucket_farming_tag)
+    await tags_service.add_tag(boots_lightness_travel_tag)
 
-    tags = tags_service.get_tags_by_item(bucket)
+    tags = await tags_service.get_tags_by_item(bucket)
 
     assert len(tags) == 3
     assert set(tags) == {
@@ -68,23 +84,50 @@ def test_get_tags_by_item(tags_service: TagsService):
     }
 
 
-def test_get_tags_by_group_name(tags_service: TagsService):
+@pytest.mark.asyncio
+async def test_get_tags_by_item_ids(tags_service: TagsService):
+    """
+    Can get all tags of several items at once, by item ID in the order given
+    """
+    bucket_cooking_tag = Tag(item_id=1925, group_name="cooking")
+    bucket_farming_tag = Tag(item_id=1925, group_name="farming")
+    pie_dish_cooking_tag = Tag(item_id=2313, group_name="cooking")
+    await tags_service.add_tags(
+        [bucket_cooking_tag, bucket_farming_tag, pie_dish_cooking_tag]
+    )
+
+    items_tags = await tags_service.get_tags_by_item_ids(
+        [2313, 88, 1925, 2313], concurrency=2
+    )
+
+    assert list(items_tags) == [2313, 88, 1925]
+    assert items_tags[2313] == [pie_dish_cooking_tag]
+    assert items_tags[88] == []
+    assert set(items_tags[1925]) == {bucket_cooking_tag, bucket_farming_tag}
+
+
+@pytest.mark.asyncio
+async def test_get_tags_by_group_name(tags_service: TagsService):
     """
     Can get all tags of a given group name
     """
     copper_ore_ores_tag = Tag(item_id=436, group_name="ores")
     tin_ore_ores_tag = Tag(item_id=438, group_name="ores")
     iron_ore_ores_tag = Tag(item_id=440, group_name="ores")
-    tags_service.add_tag(copper_ore_ores_tag)
-    tags_service.add_tag(Tag(item_id=2349, group_name="bars"))  # Unrelated item + group
-    tags_service.add_tag(tin_ore_ores_tag)
-    tags_service.add_tag(
+    await tags_service.add_tag(copper_ore_ores_tag)
+    await tags_service.add_tag(
+        Tag(item_id=2349, group_name="bars")
+    )  # Unrelated item + group
+    await tags_service.add_tag(tin_ore_ores_tag)
+    await tags_service.add_tag(
         Tag(item_id=436, group_name="favourite")
     )  # Wrong group, match item
-    tags_service.add_tag(iron_ore_ores_tag)
-    tags_service.add_tag(Tag(item_id=2351, group_name="bars"))  # Unrelated item + group
+    await tags_service.add_tag(iron_ore_ores_tag)
+    await tags_service.add_tag(
+        Tag(item_id=2351, group_name="bars")
+    )  # Unrelated item + group
 
-    tags = tags_service.get_tags_by_group_name("ores")
+    tags = await tags_service.get_tags_by_group_name("ores")
 
     assert len(tags) == 3
     assert set(tags) == {
@@ -92,3 +135,321 @@ def test_get_tags_by_group_name(tags_service: TagsService):
         tin_ore_ores_tag,
         iron_ore_ores_tag,
     }
+
+
+@pytest.mark.asyncio
+async def test_iter_tags_by_group_name_pages(tags_service: TagsService):
+    """
+    Tags of a group are yielded page by page, following on from each page
+    """
+    tags = {Tag(item_id=item_id, group_name="ores") for item_id in range(436, 441)}
+    for tag in tags:
+        await tags_service.add_tag(tag)
+
+    pages = [
+        page async for page in tags_service.iter_tags_by_group_name("ores", page_size=2)
+    ]
+
+    assert [len(page) for page in pages] == [2, 2, 1]
+    assert {tag for page in pages for tag in page} == tags
+
+
+@pytest.mark.asyncio
+async def test_iter_tags_by_item_limit(tags_service: TagsService):
+    """
+    No more tags than the limit are yielded
+    """
+    for group_name in ["crafting", "cooking", "farming", "favourite"]:
+        await tags_service.add_tag(Tag(item_id=1925, group_name=group_name))
+
+    pages = [
+        page
+        async for page in tags_service.iter_tags_by_item(1925, limit=3, page_size=2)
+    ]
+
+    assert [len(page) for page in pages] == [2, 1]
+
+
+@pytest.mark.asyncio
+async def test_iter_tag_groups(tags_service: TagsService):
+    """
+    All tag groups are yielded across pages
+    """
+    for group_name in ["A", "B", "C"]:
+        await tags_service.add_tag_group(TagGroup(group_name=group_name))
+
+    pages = [page async for page in tags_service.iter_tag_groups(page_size=1)]
+
+    assert len(pages) == 3
+    assert {group.group_name for page in pages for group in page} == {"A", "B", "C"}
+
+
+@pytest.mark.asyncio
+async def test_add_and_delete_tags_in_batches(tags_service: TagsService):
+    """
+    Can add and delete more tags than fit in a single batch, ignoring duplicates
+    """
+    tags = [Tag(item_id=item_id, group_name="many") for item_id in range(1, 31)]
+
+    added = await tags_service.add_tags(tags + tags[:5])
+
+    assert added == tags
+    assert set(await tags_service.get_tags_by_group_name("many")) == set(tags)
+    assert await tags_service.get_tag_group("many") == TagGroup(group_name="many")
+
+    assert await tags_service.delete_tags(tags) == tags
+    assert await tags_service.get_tags_by_group_name("many") == []
+
+
+@pytest.mark.asyncio
+async def test_add_tags_retries_unprocessed(tags_service: TagsService, monkeypatch):
+    """
+    Unprocessed writes are retried until they succeed
+    """
+    batch_write_item = tags_service.db.batch_write_item
+    calls = []
+
+    async def flaky_batch_write_item(RequestItems):
+        calls.append(RequestItems)
+        if len(calls) == 1:
+            (table_name, requests), *_ = RequestItems.items()
+            await batch_write_item(RequestItems={table_name: requests[:1]})
+            return {"UnprocessedItems": {table_name: requests[1:]}}
+        return await batch_write_item(RequestItems=RequestItems)
+
+    monkeypatch.setattr(tags_service.db, "batch_write_item", flaky_batch_write_item)
+    monkeypatch.setattr("osrs_items_api.tags_service.BATCH_WRITE_BACKOFF", 0)
+
+    tags = [Tag(item_id=item_id, group_name="flaky") for item_id in range(1, 4)]
+    await tags_service.add_tags(tags)
+
+    assert len(calls) == 2
+    assert set(await tags_service.get_tags_by_group_name("flaky")) == set(tags)
+
+
+@pytest.mark.asyncio
+async def test_delete_tag_group_cascades(tags_service: TagsService):
+    """
+    Deleting a tag group deletes all of its tags, across several batches, and
+    leaves other groups' tags alone
+    """
+    await tags_service.add_tags(
+        Tag(item_id=item_id, group_name="many") for item_id in range(1, 61)
+    )
+    await tags_service.add_tag(Tag(item_id=1, group_name="other"))
+
+    deleted = await tags_service.delete_tag_group(TagGroup(group_name="many"))
+
+    assert deleted == 60
+    assert await tags_service.get_tags_by_group_name("many") == []
+    assert await tags_service.get_tag_group("many") is None
+    assert await tags_service.get_tags_by_group_name("other") == [
+        Tag(item_id=1, group_name="other")
+    ]
+
+
+@pytest.mark.asyncio
+async def test_delete_tag_group_bounded(tags_service: TagsService, monkeypatch):
+    """
+    Deleting a tag group writes a bounded number of batches at once, rather
+    than scheduling every batch as soon as it's read
+    """
+    await tags_service.add_tags(
+        Tag(item_id=item_id, group_name="many") for item_id in range(1, 61)
+    )
+    monkeypatch.setattr("osrs_items_api.tags_service.BATCH_WRITE_SIZE", 1)
+
+    batch_write = tags_service._batch_write
+    writing = 0
+    most_writing = 0
+    most_tasks = 0
+
+    async def counting_batch_write(table_name, requests):
+        nonlocal writing, most_writing, most_tasks
+        writing += 1
+        most_writing = max(most_writing, writing)
+        most_tasks = max(most_tasks, len(asyncio.all_tasks()))
+        try:
+            await batch_write(table_name, requests)
+        finally:
+            writing -= 1
+
+    monkeypatch.setattr(tags_service, "_batch_write", counting_batch_write)
+    tasks_before = len(asyncio.all_tasks())
+
+    assert await tags_service.delete_tag_group(TagGroup(group_name="many")) == 60
+    assert await tags_service.get_tags_by_group_name("many") == []
+    assert most_writing == DELETE_CONCURRENCY
+    # A handful of tasks (workers, and the client's own) do all 60 batches,
+    # rather than one each
+    assert most_tasks - tasks_before < 15
+
+
+@pytest.mark.asyncio
+async def test_connect_shares_resource(tags_service: TagsService):
+    """
+    Services connect through one shared DynamoDB resource
+    """
+    other_service = await TagsService.connect()
+
+    assert other_service.db is tags_service.db
+    assert other_service.db is await dynamodb()
+
+
+@pytest.mark.asyncio
+async def test_shared_service(tags_service: TagsService):
+    """
+    The shared service is reused until its DynamoDB resource is closed
+    """
+    shared = await TagsService.shared()
+    assert await TagsService.shared() is shared
+    assert shared.db is tags_service.db
+
+    await close_dynamodb()
+    reopened = await TagsService.shared()
+    assert reopened is not shared
+    assert reopened.db is await dynamodb()
+
+
+@pytest.mark.asyncio
+async def test_add_tag_keeps_existing_group(tags_service: TagsService):
+    """
+    Tagging an item with an existing group doesn't overwrite the group's info
+    """
+    group = TagGroup(group_name="food", description="Tasty", item_icon_id=1891)
+    await tags_service.add_tag_group(group)
+    known_tag_groups.clear()
+
+    await tags_service.add_tag(Tag(item_id=1891, group_name="food"))
+
+    assert await tags_service.get_tag_group("food") == group
+
+
+@pytest.mark.asyncio
+async def test_add_tag_skips_known_groups(tags_service: TagsService, monkeypatch):
+    """
+    Groups already known to exist aren't written again, until they're deleted
+    """
+    put_item = tags_service.tag_groups_table.put_item
+    group_writes = []
+
+    async def counting_put_item(**kwargs):
+        group_writes.append(kwargs["Item"]["group_name"])
+        return await put_item(**kwargs)
+
+    monkeypatch.setattr(tags_service.tag_groups_table, "put_item", counting_put_item)
+
+    await tags_service.add_tag(Tag(item_id=1891, group_name="food"))
+    await tags_service.add_tags([Tag(item_id=1925, group_name="food")])
+    assert group_writes == ["food"]
+
+    await tags_service.delete_tag_group(TagGroup(group_name="food"))
+    await tags_service.add_tag(Tag(item_id=1891, group_name="food"))
+    assert group_writes == ["food", "food"]
+    assert await tags_service.get_tag_group("food") == TagGroup(group_name="food")
+
+
+@pytest.mark.asyncio
+async def test_all_tag_groups_cached(tags_service: TagsService, monkeypatch):
+    """
+    All tag groups are read once, consistently, then kept up to date with
+    writes made by this process
+    """
+    scan = tags_service.tag_groups_table.scan
+    scans = []
+
+    async def counting_scan(**kwargs):
+        scans.append(kwargs)
+        return await scan(**kwargs)
+
+    monkeypatch.setattr(tags_service.tag_groups_table, "scan", counting_scan)
+
+    await tags_service.add_tag_group(TagGroup(group_name="A"))
+    assert await tags_service.all_tag_groups() == [TagGroup(group_name="A")]
+    assert all(kwargs["ConsistentRead"] for kwargs in scans)
+    scan_count = len(scans)
+
+    await tags_service.add_tag(Tag(item_id=1891, group_name="B"))
+    await tags_service.delete_tag_group(TagGroup(group_name="A"))
+    assert await tags_service.all_tag_groups() == [TagGroup(group_name="B")]
+    assert len(scans) == scan_count
+
+    # Once expired, the snapshot is only read again if the version has changed
+    monkeypatch.setattr(tag_groups_snapshot, "ttl", 0)
+    assert await tags_service.all_tag_groups() == [TagGroup(group_name="B")]
+    assert len(scans) == scan_count
+
+
+@pytest.mark.asyncio
+async def test_all_tag_groups_other_writers(tags_service: TagsService, monkeypatch):
+    """
+    Changes to tag groups made elsewhere are picked up once the snapshot expires
+    """
+    await tags_service.add_tag_group(TagGroup(group_name="A"))
+    assert await tags_service.all_tag_groups() == [TagGroup(group_name="A")]
+
+    # Written by another instance of the API
+    await tags_service.tag_groups_table.put_item(Item={"group_name": "B"})
+    await tags_service.tag_groups_table.update_item(
+        Key={"group_name": TAG_GROUPS_VERSION_KEY},
+        UpdateExpression="ADD version :one",
+        ExpressionAttributeValues={":one": 1},
+    )
+    assert await tags_service.all_tag_groups() == [TagGroup(group_name="A")]
+
+    monkeypatch.setattr(tag_groups_snapshot, "ttl", 0)
+    assert {group.group_name for group in await tags_service.all_tag_groups()} == {
+        "A",
+        "B",
+    }
+    assert await tags_service.tag_groups_version() == 2
+
+
+@pytest.mark.asyncio
+async def test_scan_tags(tags_service: TagsService):
+    """
+    Every tag is yielded once by a parallel scan, in any order or by segment
+    """
+    tags = [
+        Tag(item_id=item_id, group_name=group_name)
+        for item_id in range(1, 21)
+        for group_name in ["A", "B"]
+    ]
+    await tags_service.add_tags(tags)
+
+    unordered = [
+        tag
+        async for page in tags_service.scan_tags(segments=3, page_size=4)
+        for tag in page
+    ]
+    ordered = [
+        tag
+        async for page in tags_service.scan_tags(segments=3, ordered=True)
+        for tag in page
+    ]
+    ordered_again = [
+        tag
+        async for page in tags_service.scan_tags(segments=3, ordered=True)
+        for tag in page
+    ]
+
+    assert sorted(unordered, key=str) == sorted(tags, key=str)
+    assert sorted(ordered, key=str) == sorted(tags, key=str)
+    assert ordered == ordered_again
+
+
+@pytest.mark.asyncio
+async def test_scan_tag_groups(tags_service: TagsService):
+    """
+    A parallel scan of tag groups leaves out the version sentinel
+    """
+    for group_name in ["A", "B", "C"]:
+        await tags_service.add_tag_group(TagGroup(group_name=group_name))
+
+    groups = [
+        group
+        async for page in tags_service.scan_tag_groups(segments=2)
+        for group in page
+    ]
+
+    assert {group.group_name for group in groups} == {"A", "B", "C"}
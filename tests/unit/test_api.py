@@ -0,0 +1,56 @@
+from typing import Generator
+
+import pytest
+from fastapi.testclient import TestClient
+
+from osrs_items_api.api import create_app
+from osrs_items_api.sqlite_tag_store import SQLiteTagStore
+
+
+@pytest.fixture
+def api_client() -> Generator[TestClient, None, None]:
+    """
+    Return an API test client over an in-memory SQLite tag store
+    """
+    tag_store = SQLiteTagStore()
+    with TestClient(create_app(tag_store)) as client:
+        yield client
+    tag_store.close()
+
+
+def test_tags_without_dynamodb(api_client: TestClient):
+    """
+    POST /tags, GET /items?hasTags, GET /groups OK
+    Apps can be built over tag stores other than DynamoDB
+    """
+    result = api_client.post(
+        "/tags",
+        json=[
+            {"itemId": 1891, "groupName": "food"},
+            {"itemId": 1925, "groupName": "food"},
+            {"itemId": 1925, "groupName": "buckets"},
+        ],
+    )
+    assert result.status_code == 200
+
+    result = api_client.get("/items?hasTags=food,buckets&fields=itemId")
+    assert result.json() == {"totalCount": 1, "items": [{"itemId": 1925}]}
+
+    result = api_client.get("/groups?hasItems=1925")
+    assert [group["groupName"] for group in result.json()] == ["buckets", "food"]
+
+    result = api_client.delete("/group", json={"groupName": "food"})
+    assert result.status_code == 200
+    assert api_client.get("/tags/item/1925").json() == [
+        {"itemId": 1925, "groupName": "buckets"}
+    ]
+
+
+def test_get_item_tags_unknown_item(api_client: TestClient):
+    """
+    GET /tags/item OK
+    Items that don't exist have no tags
+    """
+    result = api_client.get("/tags/item/99999999")
+    assert result.status_code == 200
+    assert result.json() == []
@@ -0,0 +1,152 @@
+import json
+
+from osrs_items_api.catalog import ItemCatalog, ItemRecord
+from osrs_items_api.types import Item
+
+
+def make_record(item_id: int, members: bool = False, **kwargs) -> ItemRecord:
+    return ItemRecord(
+        item_id=item_id, name=f"Item {item_id}", members=members, **kwargs
+    )
+
+
+def make_catalog(*records: ItemRecord) -> ItemCatalog:
+    return ItemCatalog(records, load_icon=lambda item_id: f"icon {item_id}")
+
+
+def test_main_items_sorted_by_id():
+    """
+    Main items are held in order of ID, whatever order they're given in
+    """
+    catalog = make_catalog(make_record(3), make_record(1), make_record(2))
+
+    assert [item.item_id for item in catalog.main_items] == [1, 2, 3]
+    assert catalog.positions == {1: 0, 2: 1, 3: 2}
+
+
+def test_members_partitions():
+    """
+    Main items are partitioned into members and free-to-play items
+    """
+    catalog = make_catalog(
+        make_record(1),
+        make_record(2, members=True),
+        make_record(3),
+        make_record(4, members=True),
+    )
+
+    assert [item.item_id for item in catalog.members_items] == [2, 4]
+    assert [item.item_id for item in catalog.free_items] == [1, 3]
+
+
+def test_get():
+    """
+    Main items can be looked up by ID, and are built from their records
+    """
+    catalog = make_catalog(
+        make_record(5), make_record(10), make_record(11, linked_id_item=10)
+    )
+
+    assert catalog.get(10) == Item(
+        item_id=10, name="Item 10", members=False, icon_base64="icon 10"
+    )
+    assert catalog.get(6) is None
+    assert catalog.get(11) is None
+    assert catalog.item(11).item_id == 11
+    assert catalog.is_main_item(5)
+    assert not catalog.is_main_item(6)
+    assert not catalog.is_main_item(11)
+
+
+def test_items_built_once():
+    """
+    Items are only built from their records once
+    """
+    loaded = []
+
+    def load_icon(item_id: int) -> str:
+        loaded.append(item_id)
+        return ""
+
+    catalog = ItemCatalog([make_record(1), make_record(2)], load_icon=load_icon)
+    assert loaded == []
+
+    catalog.item(1)
+    catalog.item(1)
+    list(catalog.main_items)
+    assert loaded == [1, 2]
+
+
+def test_related_ids():
+    """
+    Related item IDs are indexed by the main item they're linked to
+    """
+    catalog = make_catalog(
+        make_record(1),
+        make_record(5),
+        make_record(3, linked_id_item=1),
+        make_record(2, linked_id_item=1),
+    )
+
+    assert catalog.get_related_ids(1) == (2, 3)
+    assert catalog.get_related_ids(5) == ()
+
+
+def test_item_json():
+    """
+    Items are serialised to camelCase JSON, which lists of items are joined from
+    """
+    catalog = make_catalog(make_record(1), make_record(2, members=True))
+
+    assert json.loads(catalog.item_json(1)) == {
+        "itemId": 1,
+        "name": "Item 1",
+        "members": False,
+        "iconBase64": "icon 1",
+    }
+    assert catalog.item_json(1) is catalog.item_json(1)
+    assert json.loads(catalog.items_json([2, 1])) == [
+        item.dict(by_alias=True) for item in [catalog.item(2), catalog.item(1)]
+    ]
+    assert catalog.items_json([]) == b"[]"
+
+
+def test_project():
+    """
+    Some fields of items can be read without loading their icons, unless the
+    icon is one of them
+    """
+    loaded = []
+
+    def load_icon(item_id: int) -> str:
+        loaded.append(item_id)
+        return f"icon {item_id}"
+
+    catalog = ItemCatalog([make_record(1, members=True)], load_icon=load_icon)
+
+    fields = {"itemId": "item_id", "name": "name", "members": "members"}
+    assert catalog.project(1, fields) == {
+        "itemId": 1,
+        "name": "Item 1",
+        "members": True,
+    }
+    assert loaded == []
+
+    assert catalog.project(1, {"iconBase64": "icon_base64"}) == {"iconBase64": "icon 1"}
+    assert loaded == [1]
+
+
+def test_name_index():
+    """
+    Main items are indexed by name when the catalog is built, not on the first
+    search
+    """
+    catalog = make_catalog(
+        make_record(1),
+        make_record(2, wiki_name="Wiki 2"),
+        make_record(3, linked_id_item=1),
+    )
+
+    assert "name_index" in vars(catalog)
+    assert catalog.name_index.search("item") == [0, 1]
+    assert catalog.name_index.search("wiki") == [1]
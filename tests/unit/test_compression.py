@@ -0,0 +1,57 @@
+import gzip
+
+import pytest
+
+from osrs_items_api import compression
+from osrs_items_api.compression import CompressedBodies, accepted_encoding
+
+
+@pytest.mark.parametrize(
+    "accept_encoding, expected",
+    [
+        (None, None),
+        ("", None),
+        ("identity", None),
+        ("gzip", "gzip"),
+        ("deflate, gzip;q=0.5", "gzip"),
+        ("gzip;q=0", None),
+        ("*", compression.ENCODINGS[0]),
+        ("*, gzip;q=0", "br" if compression.brotli is not None else None),
+        ("br", "br" if compression.brotli is not None else None),
+    ],
+)
+def test_accepted_encoding(accept_encoding, expected):
+    """
+    The most preferred supported encoding is negotiated from Accept-Encoding
+    """
+    assert accepted_encoding(accept_encoding) == expected
+
+
+def test_compress_gzip():
+    """
+    Bodies are compressed with the negotiated encoding
+    """
+    body = b'{"items":[]}' * 100
+    assert gzip.decompress(compression.compress(body, "gzip")) == body
+
+    with pytest.raises(ValueError):
+        compression.compress(body, "deflate")
+
+
+def test_compressed_bodies_lru():
+    """
+    Only the most recently used compressed bodies are kept
+    """
+    bodies = CompressedBodies(max_entries=2)
+    bodies.put("a", "gzip", b"1")
+    bodies.put("b", "gzip", b"2")
+    assert bodies.get("a", "gzip") == b"1"
+
+    bodies.put("c", "gzip", b"3")
+    assert bodies.get("b", "gzip") is None
+    assert bodies.get("a", "gzip") == b"1"
+    assert bodies.get("a", "br") is None
+    assert bodies.get("c", "gzip") == b"3"
+
+    bodies.clear()
+    assert bodies.get("c", "gzip") is None
@@ -0,0 +1,19 @@
+from osrs_items_api.constants import (
+    DYNAMODB_CONNECT_TIMEOUT,
+    DYNAMODB_MAX_POOL_CONNECTIONS,
+    DYNAMODB_READ_TIMEOUT,
+)
+from osrs_items_api.dynamodb import dynamodb_config
+
+
+def test_dynamodb_config():
+    """
+    The client config builds with the installed botocore, keeping connections
+    alive in a pool
+    """
+    config = dynamodb_config()
+
+    assert config.tcp_keepalive is True
+    assert config.max_pool_connections == DYNAMODB_MAX_POOL_CONNECTIONS
+    assert config.connect_timeout == DYNAMODB_CONNECT_TIMEOUT
+    assert config.read_timeout == DYNAMODB_READ_TIMEOUT
@@ -0,0 +1,49 @@
+import base64
+
+from osrs_items_api import items_service
+from osrs_items_api.icon_store import IconStore, _png_size
+
+CAKE_ID = 1891
+BUCKET_ID = 1925
+
+
+def item_icon(item_id: int) -> bytes:
+    return base64.b64decode(items_service.get_item(item_id).icon_base64)
+
+
+def test_get():
+    """
+    Icons can be looked up by item ID
+    """
+    store = IconStore(
+        IconStore.build(
+            [(BUCKET_ID, item_icon(BUCKET_ID)), (CAKE_ID, item_icon(CAKE_ID))]
+        )
+    )
+
+    assert len(store) == 2
+    assert store.get(CAKE_ID) == item_icon(CAKE_ID)
+    assert store.get(BUCKET_ID) == item_icon(BUCKET_ID)
+    assert store.get(1) is None
+
+
+def test_open(tmp_path):
+    """
+    Icon stores can be memory-mapped from a file
+    """
+    path = tmp_path / "icons.bin"
+    path.write_bytes(IconStore.build([(CAKE_ID, item_icon(CAKE_ID))]))
+
+    assert IconStore.open(path).get(CAKE_ID) == item_icon(CAKE_ID)
+
+
+def test_sprite_sheet():
+    """
+    Sprite sheets have a cell for every requested item, including missing ones
+    """
+    store = IconStore(IconStore.build([(CAKE_ID, item_icon(CAKE_ID))]))
+    width, height = _png_size(item_icon(CAKE_ID))
+
+    sprite_sheet = store.sprite_sheet([CAKE_ID, 1, CAKE_ID])
+
+    assert _png_size(sprite_sheet) == (width, 3 * height)
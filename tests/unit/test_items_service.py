@@ -0,0 +1,102 @@
+from osrs_items_api import items_service
+
+CAKE = 1891
+NOTED_CAKE = 1892
+CAKE_PLACEHOLDER = 19099
+CAKE_TIN = 1887
+SLICE_OF_CAKE = 1895
+
+
+def test_page_by_id():
+    """
+    Pages of IDs can start after an item ID, or at an offset
+    """
+    item_ids = [10, 20, 30, 40]
+
+    assert items_service.page_by_id(item_ids, limit=2) == ([10, 20], 4)
+    assert items_service.page_by_id(item_ids, after=20) == ([30, 40], 4)
+    assert items_service.page_by_id(item_ids, after=25, limit=1) == ([30], 4)
+    assert items_service.page_by_id(item_ids, after=20, offset=1) == ([40], 4)
+
+
+def test_page_by_id_related():
+    """
+    Related items are merged into pages in order of ID
+    """
+    item_ids = [CAKE_TIN, CAKE, SLICE_OF_CAKE]
+
+    assert items_service.page_by_id(item_ids, include_related=True) == (
+        [
+            CAKE_TIN,
+            1888,
+            CAKE,
+            NOTED_CAKE,
+            SLICE_OF_CAKE,
+            1896,
+            19097,
+            CAKE_PLACEHOLDER,
+            19101,
+        ],
+        9,
+    )
+    assert items_service.page_by_id(
+        item_ids, include_related=True, after=SLICE_OF_CAKE, limit=2
+    ) == ([1896, 19097], 9)
+
+
+def test_page_by_id_related_precomputed():
+    """
+    Pages of all main items, or all free-to-play items, with related items come
+    from lists merged with the catalog, matching those merged per request
+    """
+    catalog = items_service.catalog
+    for item_ids in (catalog.main_ids, catalog.free_ids):
+        for after in (None, CAKE, NOTED_CAKE):
+            page = items_service.page_by_id(
+                item_ids, include_related=True, after=after, offset=3, limit=50
+            )
+            assert page == items_service.page_by_id(
+                list(item_ids), include_related=True, after=after, offset=3, limit=50
+            )
+            assert len(page[0]) == 50
+
+
+def test_page_by_relevance():
+    """
+    Pages ordered by relevance have exact matches, then prefix matches, then
+    other matches
+    """
+    item_ids = [CAKE_TIN, CAKE, SLICE_OF_CAKE]
+
+    assert items_service.page_by_relevance(item_ids, "cake", limit=2) == (
+        [CAKE, CAKE_TIN],
+        3,
+    )
+    assert items_service.page_by_relevance(item_ids, "cake", after=CAKE_TIN) == (
+        [SLICE_OF_CAKE],
+        3,
+    )
+
+
+def test_page_by_relevance_related():
+    """
+    Related items follow their main item in pages ordered by relevance
+    """
+    item_ids = [CAKE_TIN, CAKE]
+
+    assert items_service.page_by_relevance(item_ids, "cake", include_related=True) == (
+        [CAKE, NOTED_CAKE, CAKE_PLACEHOLDER, CAKE_TIN, 1888, 19097],
+        6,
+    )
+    assert items_service.page_by_relevance(
+        item_ids, "cake", include_related=True, after=NOTED_CAKE, limit=2
+    ) == ([CAKE_PLACEHOLDER, CAKE_TIN], 6)
+
+
+def test_lookup_item_ids():
+    """
+    Items of any kind are looked up by ID in the order given, without duplicates
+    """
+    assert items_service.lookup_item_ids(
+        [NOTED_CAKE, 999999, CAKE, NOTED_CAKE, -1, 999999]
+    ) == ([NOTED_CAKE, CAKE], [999999, -1])
@@ -0,0 +1,62 @@
+from osrs_items_api.name_index import (
+    EXACT_MATCH,
+    PREFIX_MATCH,
+    SUBSTRING_MATCH,
+    NameIndex,
+)
+
+NAMES = [
+    ("Cake",),
+    ("Cake tin",),
+    ("Slice of cake",),
+    ("Chocolate cake", "Chocolate cake (item)"),
+    ("Bucket",),
+]
+
+
+def test_search_short_keyword():
+    """
+    Keywords short enough to be a single n-gram match case-insensitively
+    """
+    index = NameIndex(NAMES)
+    assert index.search("CA") == [0, 1, 2, 3]
+    assert index.search("t") == [1, 3, 4]
+
+
+def test_search_long_keyword():
+    """
+    Longer keywords match names that contain the whole keyword, not only all of
+    its n-grams
+    """
+    index = NameIndex([*NAMES, ("Cakecake",), ("Kecak",)])
+    assert index.search("cake t") == [1]
+    assert index.search("ecake") == [5]
+    assert index.search("cakes") == []
+
+
+def test_search_any_name():
+    """
+    Entries match if any of their names match
+    """
+    index = NameIndex(NAMES)
+    assert index.search("(item)") == [3]
+
+
+def test_search_prefix():
+    """
+    Prefix search only matches names starting with the keyword
+    """
+    index = NameIndex(NAMES)
+    assert index.search_prefix("cake") == [0, 1]
+    assert index.search_prefix("CHOCOLATE CAKE (") == [3]
+    assert index.search_prefix("ake") == []
+
+
+def test_relevance():
+    """
+    Exact matches rank above prefix matches, which rank above substring matches
+    """
+    index = NameIndex(NAMES)
+    assert index.relevance("cake", 0) == EXACT_MATCH
+    assert index.relevance("cake", 1) == PREFIX_MATCH
+    assert index.relevance("cake", 2) == SUBSTRING_MATCH
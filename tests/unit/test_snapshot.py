@@ -0,0 +1,58 @@
+import base64
+
+from osrs_items_api import items_service
+from osrs_items_api.catalog import ItemRecord
+from osrs_items_api.snapshot import CatalogSnapshot
+
+RECORDS = [
+    ItemRecord(item_id=1892, name="Cake", members=False, linked_id_item=1891),
+    ItemRecord(item_id=1891, name="Cake", members=False, wiki_name="Cake (item)"),
+    ItemRecord(item_id=1305, name="Dragon longsword", members=True),
+]
+
+SOURCE_VERSION = "2.2.3"
+
+CAKE_ICON = items_service.get_item(1891).icon_base64
+NOTED_CAKE_ICON = items_service.get_item(1892).icon_base64
+ICONS = [
+    (1891, base64.b64decode(CAKE_ICON)),
+    (1892, base64.b64decode(NOTED_CAKE_ICON)),
+]
+
+
+def test_records_round_trip():
+    """
+    Item records can be read back from a snapshot, in order of ID
+    """
+    snapshot = CatalogSnapshot(CatalogSnapshot.build(RECORDS, [], SOURCE_VERSION))
+
+    assert len(snapshot) == 3
+    assert list(snapshot.records()) == sorted(RECORDS)
+    assert snapshot.source_version == SOURCE_VERSION
+
+
+def test_open(tmp_path):
+    """
+    Snapshots can be memory-mapped from a file
+    """
+    path = tmp_path / "catalog.bin"
+    path.write_bytes(CatalogSnapshot.build(RECORDS, ICONS, SOURCE_VERSION))
+
+    snapshot = CatalogSnapshot.open(path)
+
+    assert list(snapshot.records()) == sorted(RECORDS)
+    assert snapshot.icons.get(1892) == base64.b64decode(NOTED_CAKE_ICON)
+
+
+def test_catalog():
+    """
+    Catalogs built from snapshots read icons from the snapshot
+    """
+    catalog = CatalogSnapshot(
+        CatalogSnapshot.build(RECORDS, ICONS, SOURCE_VERSION)
+    ).catalog()
+
+    assert [item.item_id for item in catalog.main_items] == [1305, 1891]
+    assert catalog.get_related_ids(1891) == (1892,)
+    assert catalog.item(1891).icon_base64 == CAKE_ICON
+    assert catalog.item(1305).icon_base64 == ""
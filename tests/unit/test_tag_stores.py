@@ -0,0 +1,120 @@
+from pathlib import Path
+from typing import Generator
+
+import pytest
+
+from osrs_items_api.memory_tag_store import MemoryTagStore
+from osrs_items_api.sqlite_tag_store import SQLiteTagStore
+from osrs_items_api.tag_store import TagStore
+from osrs_items_api.types import Tag, TagGroup
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def tag_store(request, tmp_path: Path) -> Generator[TagStore, None, None]:
+    """
+    Each of the tag stores that don't need DynamoDB, empty
+    """
+    if request.param == "memory":
+        yield MemoryTagStore()
+    else:
+        store = SQLiteTagStore(tmp_path / "tags.sqlite3")
+        yield store
+        store.close()
+
+
+@pytest.mark.asyncio
+async def test_tags_by_item_and_group(tag_store: TagStore):
+    """
+    Tags can be looked up by item, in order of group name, and by group, in
+    order of item ID
+    """
+    tags = [
+        Tag(item_id=1925, group_name="farming"),
+        Tag(item_id=2313, group_name="cooking"),
+        Tag(item_id=1925, group_name="cooking"),
+        Tag(item_id=1925, group_name="farming"),
+    ]
+    assert await tag_store.add_tags(tags) == tags[:3]
+
+    assert await tag_store.get_tags_by_item_id(1925) == [
+        Tag(item_id=1925, group_name="cooking"),
+        Tag(item_id=1925, group_name="farming"),
+    ]
+    assert await tag_store.get_tags_by_group_name("cooking") == [
+        Tag(item_id=1925, group_name="cooking"),
+        Tag(item_id=2313, group_name="cooking"),
+    ]
+    assert await tag_store.get_tags_by_item_ids([2313, 88, 2313]) == {
+        2313: [Tag(item_id=2313, group_name="cooking")],
+        88: [],
+    }
+
+    await tag_store.delete_tags([tags[0], Tag(item_id=88, group_name="travel")])
+    assert await tag_store.get_tags_by_group_name("farming") == []
+
+
+@pytest.mark.asyncio
+async def test_tag_groups(tag_store: TagStore):
+    """
+    Tagging items creates their groups, whose info can then be overwritten
+    """
+    await tag_store.add_tag(Tag(item_id=1925, group_name="farming"))
+    assert await tag_store.all_tag_groups() == [TagGroup(group_name="farming")]
+
+    farming = TagGroup(group_name="farming", description="Seeds", item_icon_id=5291)
+    cooking = TagGroup(group_name="cooking", description="Food")
+    await tag_store.add_tag_group(farming)
+    await tag_store.add_tag_group(cooking)
+    await tag_store.add_tag(Tag(item_id=5291, group_name="farming"))
+
+    assert await tag_store.get_tag_group("farming") == farming
+    assert await tag_store.get_tag_group("travel") is None
+    assert await tag_store.all_tag_groups() == [cooking, farming]
+
+
+@pytest.mark.asyncio
+async def test_delete_tag_group(tag_store: TagStore):
+    """
+    Deleting a group deletes its tags, unless asked not to
+    """
+    await tag_store.add_tags(
+        [
+            Tag(item_id=1925, group_name="farming"),
+            Tag(item_id=5291, group_name="farming"),
+            Tag(item_id=1925, group_name="cooking"),
+            Tag(item_id=2313, group_name="cooking"),
+        ]
+    )
+
+    assert await tag_store.delete_tag_group(TagGroup(group_name="farming")) == 2
+    assert await tag_store.get_tags_by_item_id(1925) == [
+        Tag(item_id=1925, group_name="cooking")
+    ]
+
+    cooking = TagGroup(group_name="cooking")
+    assert await tag_store.delete_tag_group(cooking, delete_tags=False) == 0
+    assert await tag_store.all_tag_groups() == []
+    assert len(await tag_store.get_tags_by_group_name("cooking")) == 2
+
+
+def test_sqlite_covering_indexes(tmp_path: Path):
+    """
+    SQLite answers lookups by item and by group from covering indexes, in WAL
+    mode
+    """
+    store = SQLiteTagStore(tmp_path / "tags.sqlite3")
+    db = store._db
+
+    def plan(sql: str, *params) -> str:
+        return " ".join(
+            row[-1] for row in db.execute(f"EXPLAIN QUERY PLAN {sql}", params)
+        )
+
+    assert db.execute("PRAGMA journal_mode").fetchone() == ("wal",)
+    assert "USING PRIMARY KEY (item_id=?)" in plan(
+        "SELECT group_name FROM tags WHERE item_id = ? ORDER BY group_name", 1
+    )
+    assert "USING COVERING INDEX tags_by_group (group_name=?)" in plan(
+        "SELECT item_id FROM tags WHERE group_name = ? ORDER BY item_id", "food"
+    )
+    store.close()